@@ -104,7 +104,7 @@ class AppController(QObject):
     # End of def on_point_changed
 
 
-    @Slot(object, object)
+    @Slot(int, CUD)
     def on_instance_changed(self, instance_id:InstanceID, cud:CUD):
         if cud == CUD.DELETE:
             # Delete all annotations for this instance
@@ -66,6 +66,7 @@ class AnnotationsController(QObject):
 
     point_list_changed = Signal(object, CUD) #list[PointAnnotation], CUD
     bbox_list_changed = Signal(object, CUD) #list[BBoxAnnotation], CUD
+    frame_annotations_changed = Signal(object) #FrameID
 
     # --- --- --- Init --- --- ---
 
@@ -75,17 +76,23 @@ class AnnotationsController(QObject):
         self.annotations:dict[PointID, PointAnnotation] = {}
         self.bboxes:dict[BBoxID, BBoxAnnotation] = {}
         self._next_point_id:int = 0
+        self._frame_versions:dict[FrameID, int] = {}
+        self._next_version:int = 0
     # End of def __init__
 
     
     def reset(self) -> None:
         annotations = list(self.annotations.values())
+        touched_frames = list(self._frame_versions.keys())
+        self._frame_versions = {} # Versions are never reused, see _touch_frame
         self.per_frame = {}
         self.annotations = {}
         self.bboxes = {}
         self._next_point_id = 0
         if len(annotations) > 0:
             self.point_list_changed.emit(annotations, CUD.DELETE)
+        for frame_id in touched_frames:
+            self.frame_annotations_changed.emit(frame_id)
     # End of def reset
 
 
@@ -104,6 +111,14 @@ class AnnotationsController(QObject):
     # End of def _get_next_bid
 
 
+    def _touch_frame(self, frame_id:FrameID) -> None:
+        """Bump the annotation version of a frame. Versions come from a global counter so they are never reused."""
+        self._frame_versions[frame_id] = self._next_version
+        self._next_version += 1
+        self.frame_annotations_changed.emit(frame_id)
+    # End of def _touch_frame
+
+
 
     # --- --- --- Point CUD --- --- ---
     
@@ -116,6 +131,7 @@ class AnnotationsController(QObject):
         annotation = PointAnnotation(point_id=point_id, frame_id=frame_id, instance_id=instance_id, point=point)
         frame.create(annotation)
         self.annotations[point_id] = annotation
+        self._touch_frame(frame_id)
         self.point_list_changed.emit([annotation], CUD.CREATE)
         return annotation
     # End of def create_point
@@ -132,6 +148,8 @@ class AnnotationsController(QObject):
                     del self.per_frame[annotation.frame_id]
                 deleted_annotations.append(annotation)
         if len(deleted_annotations) > 0:
+            for frame_id in {pa.frame_id for pa in deleted_annotations}:
+                self._touch_frame(frame_id)
             self.point_list_changed.emit(deleted_annotations, CUD.DELETE)
         return deleted_annotations
     # End of def delete_point_list
@@ -153,6 +171,7 @@ class AnnotationsController(QObject):
             new_point = replace(annotation.point, position=new_position)
             new_annotation = replace(annotation, point=new_point)
             self.annotations[point_id] = new_annotation
+            self._touch_frame(annotation.frame_id)
             self.point_list_changed.emit([new_annotation], CUD.UPDATE)
             return new_annotation
         else:
@@ -173,6 +192,7 @@ class AnnotationsController(QObject):
         new_point = replace(annotation.point, kind=new_kind)
         new_annotation = replace(annotation, point=new_point)
         self.annotations[point_id] = new_annotation
+        self._touch_frame(annotation.frame_id)
         self.point_list_changed.emit([new_annotation], CUD.UPDATE)
         return new_annotation
     # End of def update_point_kind
@@ -189,6 +209,7 @@ class AnnotationsController(QObject):
         #
         ba = BBoxAnnotation(bbox_id=bbox_id, frame_id=frame_id, instance_id=instance_id, bbox=bbox)
         self.bboxes[bbox_id] = ba
+        self._touch_frame(frame_id)
         self.bbox_list_changed.emit([ba], CUD.CREATE)
         return ba
     # End of def create_bbox
@@ -200,6 +221,8 @@ class AnnotationsController(QObject):
             if (annotation := self.bboxes.pop(bid, None)) is not None:
                 deleted_annotations.append(annotation)
         if len(deleted_annotations) > 0:
+            for frame_id in {ba.frame_id for ba in deleted_annotations}:
+                self._touch_frame(frame_id)
             self.bbox_list_changed.emit(deleted_annotations, CUD.DELETE)
         return deleted_annotations
     # End of def delete_bbox_list
@@ -218,6 +241,7 @@ class AnnotationsController(QObject):
         #
         new_annotation = replace(annotation, bbox=new_bbox)
         self.bboxes[bbox_id] = new_annotation
+        self._touch_frame(annotation.frame_id)
         self.bbox_list_changed.emit([new_annotation], CUD.UPDATE)
         return new_annotation
     # End of def update_move_box
@@ -225,6 +249,12 @@ class AnnotationsController(QObject):
 
     # --- --- --- Getters --- --- ---
 
+    def version_for_frame(self, frame_id:FrameID) -> int:
+        """Return the annotation version of a frame; changes every time an annotation of this frame is created, updated or deleted."""
+        return self._frame_versions.get(frame_id, -1)
+    # End of def version_for_frame
+
+
     def get_point(self, point_id:PointID) -> PointAnnotation|None:
         return self.annotations.get(point_id, None)
     # End of def get_point
@@ -1,11 +1,12 @@
 # --- --- --- Imports --- --- ---
 # STD
+from collections import OrderedDict
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Literal, Protocol
 # 3RD
 from PySide6.QtCore import QObject, Signal, QSize
-from PySide6.QtGui import QImageReader, QImage
+from PySide6.QtGui import QImageReader, QImage, QPixmap
 # Project
 from samnotator.datamodel import FrameID
 
@@ -102,6 +103,11 @@ class FrameInfo:
 # End of class FrameInfo
 
 
+# Number of frame pixmaps kept by the FrameController: current frame and its neighbours when stepping back and forth.
+# Dedicated cache: full frames are too large for the global QPixmapCache (~10MB default), and would evict the small shared pixmaps.
+_FRAME_PIXMAP_CACHE_SIZE = 3
+
+
 class FrameController(QObject):
 
     current_frame_changed = Signal(object) # FrameID|None
@@ -112,6 +118,7 @@ class FrameController(QObject):
         self.frameid_2_stub_index:dict[FrameID, tuple[FrameStub, int]] = {}
         self.frame_sequence: list[FrameID] = []
         self.current_frame_index: int | None = None  # Index in frame_sequence, not FrameID!
+        self._frame_pixmaps: OrderedDict[FrameID, QPixmap] = OrderedDict()   # LRU of converted frames, oldest first
         # Reset
         self.reset(None)
     # End of def __init__
@@ -156,6 +163,7 @@ class FrameController(QObject):
         self.frameid_2_stub_index:dict[FrameID, tuple[FrameStub, int]] = {}
         self.frame_sequence: list[FrameID] = []
         self.current_frame_index = None
+        self._frame_pixmaps.clear()
         #
         if stubs is not None:
             for i, stub in enumerate(stubs, start=0):
@@ -199,6 +207,22 @@ class FrameController(QObject):
         return stub_tuple[0].load_data()
     # End of def get_frame_data
 
+
+    def get_frame_pixmap(self, frame_id:FrameID) -> QPixmap:
+        """ Return the frame as a QPixmap, shared through a small LRU of the last converted frames. No signal emitted."""
+        frame_pixmaps = self._frame_pixmaps
+        if (pixmap := frame_pixmaps.get(frame_id)) is not None:
+            frame_pixmaps.move_to_end(frame_id)
+            return pixmap
+        if (stub_tuple := self.frameid_2_stub_index.get(frame_id)) is None:
+            raise ValueError(f"Frame ID {frame_id} not found.")
+        pixmap = QPixmap.fromImage(stub_tuple[0].load_data())
+        frame_pixmaps[frame_id] = pixmap
+        if len(frame_pixmaps) > _FRAME_PIXMAP_CACHE_SIZE:
+            frame_pixmaps.popitem(last=False)
+        return pixmap
+    # End of def get_frame_pixmap
+
     
     def get_frame_path(self, frame_id:FrameID) -> Path|None:
         """ Return the file path for the given frame ID, or None if not applicable. No signal emitted."""
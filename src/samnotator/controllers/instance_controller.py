@@ -2,7 +2,7 @@
 # STD
 from dataclasses import dataclass
 # 3RD
-from PySide6.QtCore import QObject, Signal
+from PySide6.QtCore import QObject, Signal, QPoint
 from PySide6.QtGui import QColor, QPixmap, QPainter
 # Project
 from samnotator.datamodel import InstanceDetection, InstanceID, Instance, FrameID
@@ -17,9 +17,10 @@ from samnotator.widgets.instances.instance_renderers import MarkRenderer, MaskMo
 class InstanceInfo:
     instance:Instance
     # Render data
-    point_marks:list[QPixmap]
+    point_marks:tuple[QPixmap, ...]     # Indexed by PointKind: NEGATIVE=0, POSITIVE=1
     main_colour:QColor
     contrast_colour:QColor
+    marks_version:int = 0               # Bumped each time point_marks are re-rendered
     marker_size: int = 23
     bbox_handle_size: int = 8
     # Display options
@@ -52,10 +53,12 @@ class InstanceRenderer:
 
 class InstanceController(QObject):
 
-    instance_changed = Signal(object, CUD) # InstanceID, CUD
+    instance_changed = Signal(int, CUD) # InstanceID, CUD
     
     current_instance_changed = Signal(object) # InstanceID|None
 
+    categories_changed = Signal() # The set of categories may have changed, see all_categories
+
 
     def __init__(self, parent:QObject|None=None) -> None:
         super().__init__(parent)
@@ -93,10 +96,12 @@ class InstanceController(QObject):
         point_mark_renderer = _make_point_marker_renderer(symbols=["-", "+"], main_colour=main_colour, contrast_colour=contrast_colour)
         mask_renderer = MaskRenderer(main_colour=main_colour, contrast_colour=pick_contrast_colour(main_colour))
         self.renderers[instance_id] = InstanceRenderer(mark_renderer=point_mark_renderer, mask_renderer=mask_renderer)
-        marks = point_mark_renderer.get(pixmap_size_px=23)
+        marks = tuple(point_mark_renderer.get(pixmap_size_px=23)) # Shared via QPixmapCache across same-coloured instances
         # Store
         self.instances[instance_id] = InstanceInfo(instance=instance, point_marks=marks, main_colour=main_colour, contrast_colour=contrast_colour)
         self.instance_changed.emit(instance_id, CUD.CREATE)
+        if category_name is not None:
+            self.categories_changed.emit()
         return instance_id
     # End of def create_instance
 
@@ -104,6 +109,8 @@ class InstanceController(QObject):
     def delete_instance(self, instance_id:InstanceID) -> InstanceInfo:
         instance = self.instances.pop(instance_id)
         self.instance_changed.emit(instance_id, CUD.DELETE)
+        if instance.instance.category_name is not None:
+            self.categories_changed.emit()
         return instance
     # End of def delete_instance
 
@@ -205,9 +212,11 @@ class InstanceController(QObject):
         # --- Apply updates ---
         if do_mark_update:
             mark_renderer = self.renderers[instance_id].mark_renderer
-            new_marks = mark_renderer.get(pixmap_size_px=new_marker_size)
+            new_marks = tuple(mark_renderer.get(pixmap_size_px=new_marker_size))
+            new_marks_version = info.marks_version + 1
         else:
             new_marks = info.point_marks
+            new_marks_version = info.marks_version
 
             
 
@@ -217,6 +226,7 @@ class InstanceController(QObject):
             new_info = InstanceInfo(
                 instance=new_instance,
                 point_marks=new_marks,
+                marks_version=new_marks_version,
                 main_colour=new_main_colour,
                 contrast_colour=new_contrast_colour,
                 marker_size=new_marker_size,
@@ -226,6 +236,8 @@ class InstanceController(QObject):
             )
             self.instances[instance_id] = new_info
             self.instance_changed.emit(instance_id, CUD.UPDATE)
+            if new_cat != inst.category_name:
+                self.categories_changed.emit()
         # Else, no changes
     # End of def update_instance
 
@@ -291,6 +303,20 @@ class InstanceController(QObject):
     # End of def get_mask_for
 
 
+    def get_mask_patch_for(self, instance_id:InstanceID, frame_id:FrameID, mask_mode:MaskMode, step:int=1) -> tuple[QPixmap, QPoint]|None:
+        """Same as get_mask_for, but only render the area covered by the mask when possible: return the pixmap and its offset in the frame.
+        With step > 1, render the mask downsampled by step (see MaskRenderer.get_patch): pixmap and offset are scaled down by step."""
+        renderer = self.renderers.get(instance_id)
+        assert renderer is not None, f"Instance ID {instance_id} does not have a renderer."
+        instance = self.instances.get(instance_id)
+        assert instance is not None, f"Instance ID {instance_id} does not exist."
+        detection = instance.instance.detections.get(frame_id)
+        if detection is None or detection.mask is None:
+            return None
+        return renderer.mask_renderer.get_patch(detection.mask, mask_mode, step)
+    # End of def get_mask_patch_for
+
+
     def get_mask_for_frame(self, frame_id:FrameID) -> QPixmap|None:
         """Get masks for all instances for a given frame."""
         masks:list[QPixmap] = []
@@ -1,11 +1,13 @@
 # --- --- --- Imports --- --- ---
 # STD
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 import importlib
+import logging
 from pathlib import Path
 from typing import Any
 # 3RD
-from PySide6.QtCore import QObject, QThread, Signal, Slot
+from PySide6.QtCore import Qt, QObject, QThread, Signal, Slot
 from PySide6.QtWidgets import QApplication
 # Project
 from samnotator.models.interface import ModelInterface, ModelOutput, ModelInterfaceBuilder, InferenceInput
@@ -13,6 +15,11 @@ from samnotator.models.torch_worker import create_torch_worker, TorchWorker
 from samnotator.datamodel import InstanceID, FrameID
 
 
+# --- --- --- Logger --- --- ---
+
+logger = logging.getLogger(__name__)
+
+
 @dataclass(frozen=True, slots=True)
 class InferenceRequest:
     request_id: str                             # unique ID for this inference request
@@ -39,6 +46,7 @@ class ModelController(QObject):
 
     # Worker -> controller -> OUTSIDE
     result_inference = Signal(InferenceResult)
+    result_error = Signal(str, str)                 # request_id, message
     result_log = Signal(str)
     result_progress = Signal(float, object)         # progress [0.0-1.0], message str|None
 
@@ -52,10 +60,15 @@ class ModelController(QObject):
         self._model_base_packages: list[str] = [ "samnotator.models" ]  # Search order for model modules. Edit/extend this list as needed.
         self._builder_cache: dict[str, ModelInterfaceBuilder] = {}      # Cache model_type -> builder to avoid repeated imports
         self._active_requests:dict[str, InferenceRequest] = {}           # Active inference requests
+        # Background imports (see warm_up). The pool thread only imports and returns the builder: the dict and the cache
+        # above are only touched from the GUI thread, and load_model reuses the in-flight import instead of starting another one.
+        self._warm_up_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-warm-up")
+        self._warm_ups: dict[str, Future[ModelInterfaceBuilder]] = {}
 
         # Init
         if (app := QApplication.instance()) is not None:
             app.aboutToQuit.connect(self.unload_model)
+            app.aboutToQuit.connect(lambda: self._warm_up_pool.shutdown(wait=False, cancel_futures=True))
         else:
             raise RuntimeError("No QApplication instance found")
     # End of def __init__
@@ -68,7 +81,7 @@ class ModelController(QObject):
         worker = self._worker_thread[0]
 
         # Controller -> worker
-        self.request_model_inference.connect(worker.run_inference)
+        self.request_model_inference.connect(worker.run_inference, Qt.ConnectionType.QueuedConnection)
         self.request_model_unload.connect(worker.unload_model)
         self.request_model_load.connect(worker.load_model)
 
@@ -105,27 +118,40 @@ class ModelController(QObject):
 
     
     def _get_wrapper_builder(self, wrapper_name: str) -> ModelInterfaceBuilder:
+        """Builder of a wrapper, from the cache, else from its warm up (waiting for it if still running), else imported now. GUI thread only."""
+        if (builder := self._builder_cache.get(wrapper_name)) is not None:
+            return builder
+        if (future := self._warm_ups.pop(wrapper_name, None)) is not None:
+            try:
+                builder = future.result() # Re-raises the import error, if any
+            except Exception:
+                builder = self._import_wrapper_builder(wrapper_name) # Try again here, reporting the error to the caller
+        else:
+            builder = self._import_wrapper_builder(wrapper_name)
+        self._builder_cache[wrapper_name] = builder
+        return builder
+    # End of def _get_wrapper_builder
+
+
+    def _import_wrapper_builder(self, wrapper_name: str) -> ModelInterfaceBuilder:
         """
-        Lazily import a model module from the first base package where it exists.
+        Import a model module from the first base package where it exists.
 
         Tries:
             <base0>.<wrapper_name>
             <base1>.<wrapper_name>
             ...
-        and returns its top-level `builder` attribute.
+        and returns its top-level `builder` attribute. Touches no shared state: safe from the warm up thread.
         """
-        if wrapper_name in self._builder_cache:
-            return self._builder_cache[wrapper_name]
-
         last_import_error: Exception | None = None
 
         for base_pkg in self._model_base_packages:
             module_name = f"{base_pkg}.{wrapper_name}"
-            print(f"ModelController: trying to import model module '{module_name}'")
+            logger.debug("ModelController: trying to import model module '%s'", module_name)
             try:
                 module = importlib.import_module(module_name)
             except ImportError as e:
-                print(e)
+                logger.debug("ModelController: cannot import '%s': %r", module_name, e)
                 # remember last error, but keep trying others
                 last_import_error = e
                 continue
@@ -139,7 +165,6 @@ class ModelController(QObject):
                 raise TypeError( f"'builder' in module '{module_name}' is not callable")
 
             builder: ModelInterfaceBuilder = builder_obj  # type: ignore[assignment]
-            self._builder_cache[wrapper_name] = builder
             return builder
         #
 
@@ -148,7 +173,15 @@ class ModelController(QObject):
         if last_import_error is not None:
             msg += f" (last ImportError: {last_import_error!r})"
         raise ValueError(msg)
-    # End of def _get_builder_for_model_type
+    # End of def _import_wrapper_builder
+
+
+    @staticmethod
+    def _log_warm_up_failure(wrapper_name: str, future: Future[ModelInterfaceBuilder]) -> None:
+        """Done callback of a warm up (any thread): only logs, the result is collected by _get_wrapper_builder."""
+        if (e := future.exception()) is not None:
+            logger.warning("ModelController: warm up of '%s' failed: %r", wrapper_name, e)
+    # End of staticmethod def _log_warm_up_failure
 
 
     @Slot(str, ModelOutput)
@@ -174,6 +207,21 @@ class ModelController(QObject):
     
     # --- --- --- Public Methods --- --- ---
 
+    def warm_up(self, wrapper_name:str) -> None:
+        """
+        Import the wrapper module (and its heavy torch/transformers dependencies) in the background.
+        Does nothing if the builder is already cached, or being (or successfully) imported.
+        """
+        if wrapper_name in self._builder_cache:
+            return
+        if (future := self._warm_ups.get(wrapper_name)) is not None and not (future.done() and future.exception() is not None):
+            return
+        future = self._warm_up_pool.submit(self._import_wrapper_builder, wrapper_name)
+        future.add_done_callback(lambda f: ModelController._log_warm_up_failure(wrapper_name, f))
+        self._warm_ups[wrapper_name] = future
+    # End of def warm_up
+
+
     def load_model(self, wrapper_name:str, path: Path, device:str) -> None:
         self._reset_worker()
         builder = self._get_wrapper_builder(wrapper_name)
@@ -191,15 +239,15 @@ class ModelController(QObject):
     # End of def unload_model
 
 
-    def run_inference(self, inference_requested:InferenceRequest) -> None | str:
-        """Public inference: emit signal so worker does the work in its thread."""
+    def submit(self, inference_requested:InferenceRequest) -> None:
+        """Public inference: enqueue the request on the worker thread and return immediately. Failures are reported through result_error."""
         if self._worker_thread is None:
-            return "No model loaded"
+            self.result_error.emit(inference_requested.request_id, "No model loaded")
+            return
         #
-        else:
-            self._active_requests[inference_requested.request_id] = inference_requested
-            self.request_model_inference.emit(inference_requested.request_id, inference_requested.input_data)
-    # End of def run_inference
+        self._active_requests[inference_requested.request_id] = inference_requested
+        self.request_model_inference.emit(inference_requested.request_id, inference_requested.input_data)
+    # End of def submit
 
     
 
@@ -3,7 +3,7 @@
 from dataclasses import dataclass
 from enum import StrEnum
 from pathlib import Path
-from typing import Any, Protocol, Callable
+from typing import Any, Protocol, Callable, Sequence
 # 3RD
 import numpy as np
 from numpy.typing import NDArray
@@ -46,7 +46,7 @@ class PVSBoxPrompt:
 class PVSInstancePrompt:
     """ Prompt for one object instance in Promptable Visual Segmentation (PVS). """
     instance_id: int                    # integer object identifier (0, 1, 2, ...)
-    points: list[PVSPointPrompt]        # zero or more point prompts
+    points: Sequence[PVSPointPrompt]    # zero or more point prompts (tuple once built)
     box: PVSBoxPrompt | None            # at most one box per instance
 # End of class PVSInstancePrompt
 
@@ -55,7 +55,7 @@ class PVSInstancePrompt:
 class PVSFramePrompt:
     """ Prompt for one frame in video PVS (SAM2/SAM3 tracker style). """
     frame_index: int                    # zero-based frame index in video. Index, not FrameID! Always 0 for image.
-    instances: list[PVSInstancePrompt]  # zero or more instance prompts for this frame
+    instances: Sequence[PVSInstancePrompt]  # zero or more instance prompts for this frame (tuple once built)
 # End of class PVSFramePrompt
 
 
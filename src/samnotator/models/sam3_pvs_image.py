@@ -1,5 +1,6 @@
 # --- --- --- Imports --- --- ---
 # STD
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, cast, Callable
 import logging
@@ -27,7 +28,7 @@ class Sam3TrackerImplementation(ModelInterface):
 
     This implementation:
       - Supports only TaskType.PVS
-      - Supports only single-frame inputs (len(frames) == 1)
+      - Treats each frame as an independent image: frame i is prompted by the frame prompt with frame_index == i
       - Does NOT support video_options (video PVS).
     """
 
@@ -93,7 +94,7 @@ class Sam3TrackerImplementation(ModelInterface):
     def run(self, input_data: InferenceInput) -> ModelOutput:
         """
         Called only from the worker thread. Must return a ModelOutput.
-        This implementation only supports TaskType.PVS with len(frames) == 1 and task.video_options=None
+        This implementation only supports TaskType.PVS with task.video_options=None. Several frames are processed as a batch of independent images.
         """
         try:
             # State check
@@ -111,33 +112,50 @@ class Sam3TrackerImplementation(ModelInterface):
             frame_paths = input_data.frame_paths
 
             # Enforce image-only usage
-            if len(frame_paths) != 1:
-                return ModelOutput.failure( "Sam3TrackerImplementation: only single-frame PVS is supported in this implementation")
+            if not frame_paths:
+                return ModelOutput.failure( "Sam3TrackerImplementation: no frame provided")
 
             if task.video_options is not None:
                 return ModelOutput.failure( "Sam3TrackerImplementation: video_options are not supported (image-only implementation)")
 
-            image_path = frame_paths[0]
-
-            # Open image
-            try:
-                pil_image = Image.open(image_path).convert("RGB")
-            except Exception as e:
-                return ModelOutput.failure(f"Sam3TrackerImplementation: failed to open image: {e!r}")
-
-            width, height = pil_image.size
-
-            # Find frame prompts for this image (frame_index == 0 by convention)
-            frame_prompt: PVSFramePrompt | ModelOutput = self._select_frame_prompt_for_image(task)
-            if isinstance(frame_prompt, ModelOutput):
-                return frame_prompt
-
-            # Run PVS on this frame
-            logger.debug("Sam3TrackerImplementation.run: image=%s (%dx%d), frame_index=%d, instances=%d", image_path, width, height, frame_prompt.frame_index, len(frame_prompt.instances))
-            frame_output = self._run_pvs_image_frame(pil_image=pil_image, frame_prompt=frame_prompt, output_options=task.output_options, extra_meta={})
-            logger.debug( "Sam3TrackerImplementation.run: done, frame_index=%d, masks.shape=%s, scores.shape=%s, boxes.shape=%s", frame_output.frame_index, frame_output.masks.shape, frame_output.scores.shape, frame_output.boxes.shape)
-
-            inference_output = InferenceOutput(frame_index_results={frame_output.frame_index: frame_output})
+            # Find frame prompts for all images first: fail before doing any work
+            frame_prompts: list[PVSFramePrompt] = []
+            for frame_index in range(len(frame_paths)):
+                frame_prompt: PVSFramePrompt | ModelOutput = self._select_frame_prompt_for_image(task, frame_index)
+                if isinstance(frame_prompt, ModelOutput):
+                    return frame_prompt
+                frame_prompts.append(frame_prompt)
+            #
+
+            # Decode images one frame ahead on a side thread, so that decoding frame i+1 overlaps with running frame i.
+            # Only one decode is in flight: at most two decoded frames alive, and an early return waits for one decode at most.
+            # An unreadable image only fails its own frame (empty output, error in meta): the other frames of the batch keep their masks.
+            frame_index_results: dict[int, FrameInferenceOutput] = {}
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                next_image = pool.submit(_try_open_rgb, frame_paths[0])
+                for i, (image_path, frame_prompt) in enumerate(zip(frame_paths, frame_prompts)):
+                    # Open image
+                    pil_image = next_image.result()
+                    if i + 1 < len(frame_paths):
+                        next_image = pool.submit(_try_open_rgb, frame_paths[i + 1])
+                    if isinstance(pil_image, Exception):
+                        logger.warning("Sam3TrackerImplementation.run: failed to open image %s: %r", image_path, pil_image)
+                        frame_index_results[frame_prompt.frame_index] = FrameInferenceOutput.empty(frame_index=frame_prompt.frame_index, meta={"message": f"Failed to open image: {pil_image!r}"})
+                        self._progress_callback(len(frame_index_results) / len(frame_paths), None)
+                        continue
+
+                    width, height = pil_image.size
+
+                    # Run PVS on this frame
+                    logger.debug("Sam3TrackerImplementation.run: image=%s (%dx%d), frame_index=%d, instances=%d", image_path, width, height, frame_prompt.frame_index, len(frame_prompt.instances))
+                    frame_output = self._run_pvs_image_frame(pil_image=pil_image, frame_prompt=frame_prompt, output_options=task.output_options, extra_meta={})
+                    logger.debug( "Sam3TrackerImplementation.run: done, frame_index=%d, masks.shape=%s, scores.shape=%s, boxes.shape=%s", frame_output.frame_index, frame_output.masks.shape, frame_output.scores.shape, frame_output.boxes.shape)
+                    frame_index_results[frame_output.frame_index] = frame_output
+                    self._progress_callback(len(frame_index_results) / len(frame_paths), None)
+                #
+            # End with pool
+
+            inference_output = InferenceOutput(frame_index_results=frame_index_results)
             return ModelOutput.success(inference_output)
         except Exception as e:
             return ModelOutput.failure(f"Sam3TrackerImplementation: exception during run: {e!r}")
@@ -147,14 +165,14 @@ class Sam3TrackerImplementation(ModelInterface):
     # --- --- --- Core Logic --- --- ---
 
     @staticmethod
-    def _select_frame_prompt_for_image(task: PVSTask) -> PVSFramePrompt | ModelOutput:
-        """Image input expects one and only one frame prompt with frame index==0. Get it or return ModelOutput failure if find none or more than one."""
-        candidates:list[PVSFramePrompt] = [fp for fp in task.frame_prompts if fp.frame_index==0]
+    def _select_frame_prompt_for_image(task: PVSTask, frame_index: int) -> PVSFramePrompt | ModelOutput:
+        """Each image expects one and only one frame prompt with its frame index. Get it or return ModelOutput failure if find none or more than one."""
+        candidates:list[PVSFramePrompt] = [fp for fp in task.frame_prompts if fp.frame_index==frame_index]
         nc = len(candidates)
         match nc:
-            case 0: return ModelOutput.failure("Sam3TrackerImplementation: no acceptable frame prompt found (with frame index == 0, expected for image input)")
+            case 0: return ModelOutput.failure(f"Sam3TrackerImplementation: no acceptable frame prompt found (with frame index == {frame_index})")
             case 1: return candidates[0]
-            case _: return ModelOutput.failure(f"Sam3TrackerImplementation: multiple ({nc}) frame prompts found with frame index == 0; ambiguous for image input")
+            case _: return ModelOutput.failure(f"Sam3TrackerImplementation: multiple ({nc}) frame prompts found with frame index == {frame_index}; ambiguous for image input")
     # End of def _select_frame_prompt_for_image
 
 
@@ -248,6 +266,16 @@ class Sam3TrackerImplementation(ModelInterface):
 
 
 
+def _try_open_rgb(image_path: Path) -> Image.Image | Exception:
+    """Open and fully decode an image as RGB; return the exception instead of raising so that failures are reported per frame."""
+    try:
+        return Image.open(image_path).convert("RGB")
+    except Exception as e:
+        return e
+# End of def _try_open_rgb
+
+
+
 def builder(path: Path) -> ModelInterface | None:
     """
     Must be named 'builder' to be discoverable by ModelController.
@@ -1,6 +1,7 @@
 # --- --- --- Imports --- --- ---
 # STD
 from dataclasses import dataclass
+from typing import Sequence
 # 3RD
 import numpy as np
 from numpy.typing import NDArray
@@ -42,7 +43,7 @@ class Sam3FrameResult:
 # End of class Sam3FrameResult
 
 
-def build_prompt_batches_for_frame( frame_index: int, instances: list[PVSInstancePrompt]) -> dict[str, Sam3PromptBatch]:
+def build_prompt_batches_for_frame( frame_index: int, instances: Sequence[PVSInstancePrompt]) -> dict[str, Sam3PromptBatch]:
     """
     Build up to two Sam3PromptBatch objects for a given frame, from a list of PVSInstancePrompt.
 
@@ -60,29 +61,32 @@ def build_prompt_batches_for_frame( frame_index: int, instances: list[PVSInstanc
     #
 
     # Batch builder
+    # Padding of ragged objects, as done by the processor on ragged lists: ignored by the model (unlike -1, see below)
+    PAD_VALUE = -10
     def _make_batch(instances: list[PVSInstancePrompt], use_boxes: bool) -> Sam3PromptBatch:
-        # Data Layout without batch dimension
-        points_per_object: list[list[list[float]]] = [] # (batch=1| num_objects, num_points_per_object, 2)
-        labels_per_object: list[list[int]] = []         # (batch=1| num_objects, num_points_per_object)
-        boxes_per_object: list[list[float]] = []        # (batch=1| num_objects, 4) OR empty/None
-        instance_ids: list[int] = []                    # (batch=1| num_objects) Track IDs to preserve assignment
-
-        # Gather data
+        # Data Layout without batch dimension, as the nested lists taken by the processor.
+        # Objects with fewer points are padded with PAD_VALUE points and labels.
+        # Instances without any point (box only) get a single dummy (0, 0) point with label -1 ("not a point" for SAM).
+        max_points = max(1, max(len(inst.points) for inst in instances))
+        pad_point, pad_label = [float(PAD_VALUE), float(PAD_VALUE)], PAD_VALUE
+        points_per_object: list[list[list[float]]] = [] # (num_objects, num_points_per_object, 2)
+        labels_per_object: list[list[int]] = []         # (num_objects, num_points_per_object)
+        boxes_per_object: list[list[float]] = []        # (num_objects, 4), only used if use_boxes
+        instance_ids: list[int] = []                    # (num_objects) Track IDs to preserve assignment
+
+        # Gather data: one pass over the prompts
         for inst in instances:
-            # Instance ID
             instance_ids.append(inst.instance_id)
-            # Points & Labels
-
-            # If no points, pad with dummy negative
-            pts = [[float(p.x), float(p.y)] for p in inst.points]
-            lbls = [1 if p.is_positive else 0 for p in inst.points]
-            if not pts:
-                pts = [[0.0, 0.0]]
-                lbls = [-1]
+            if inst.points:
+                pts = [[float(p.x), float(p.y)] for p in inst.points]
+                lbls = [1 if p.is_positive else 0 for p in inst.points]
+            else:
+                pts, lbls = [[0.0, 0.0]], [-1]
+            if (missing := max_points - len(pts)) > 0:
+                pts.extend([pad_point] * missing) # Shared padding point: the processor only reads it
+                lbls.extend([pad_label] * missing)
             points_per_object.append(pts)
             labels_per_object.append(lbls)
-
-            # Boxes
             if use_boxes:
                 assert inst.box is not None, "Instance box missing in 'with_box' batch"
                 b = inst.box
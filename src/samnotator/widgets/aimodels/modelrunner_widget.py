@@ -1,12 +1,13 @@
 """Model selection + inference widget"""
 # --- --- --- Imports --- --- ---
 # STD
-from collections import defaultdict
-from dataclasses import dataclass
+from collections import defaultdict, deque
+from dataclasses import dataclass, replace
 from enum import StrEnum
+import logging
 from pathlib import Path
 # 3RD
-from PySide6.QtCore import Signal, Slot
+from PySide6.QtCore import QTimer, Signal, Slot
 from PySide6.QtWidgets import QWidget, QComboBox, QVBoxLayout, QHBoxLayout, QPushButton, QLabel
 # Project
 from samnotator.app.app_controller import AppController
@@ -15,6 +16,15 @@ from samnotator.models.interface import InferenceInput, MaskOutputOptions, PVSBo
 from samnotator.controllers.model_controller import InferenceRequest, InferenceResult
 
 
+# --- --- --- logger --- --- ---
+logger = logging.getLogger(__name__)
+
+
+# Image requests are batched: frames clicked within the delay window are sent as one request, up to the max batch size.
+_MAX_BATCH_SIZE:int = 8
+_MAX_BATCH_DELAY_MS:int = 30
+
+
 class ModelKind(StrEnum):
     IMAGE = "image"
     VIDEO = "video"
@@ -51,15 +61,18 @@ class ModelRunnerWidget(QWidget):
         self.ctl_annotations = app_controller.ctl_annotations
 
         # Model registry
-        self.models:dict[str, list[ModelInfo]] = defaultdict(list)
-        for m in models:
-            self.models[m.kind.value].append(m)
-        #
+        self.models:dict[str, list[ModelInfo]] = ModelRunnerWidget._group_by_kind(models)
 
         # Internal state
         self._model_loaded: bool = False
         self._model_running:bool = False
+        self._applied_state: tuple[bool, bool] | None = None   # (loaded, running) last pushed to the widgets
+        self._selected: ModelInfo | None = None                 # Updated on model combo changes, see get_selected_model
+        self._populating_models: bool = False                   # Programmatic combo fill: select, but do not warm up
         self._next_request_id: int = 0
+        self._frame_prompt_cache: dict[FrameID, tuple[int, PVSFramePrompt, dict[int, InstanceID]]] = {}  # frame_id -> (annotation version, prompt, instance mapping)
+        self._pending: deque[FrameID] = deque()     # Image frames waiting for the next batch (FIFO)
+        self._batch_timer: QTimer = QTimer(self)
 
         # Widgets
         self.cbb_kind: QComboBox = QComboBox()
@@ -76,8 +89,15 @@ class ModelRunnerWidget(QWidget):
     def _init_ui(self) -> None:
         # Connect to model controller
         self.ctl_model.result_inference.connect(self._on_inference_finished)
+        self.ctl_model.result_error.connect(self._on_inference_error)
+        self.ctl_annotations.frame_annotations_changed.connect(self._on_frame_annotations_changed)
         self.ctl_model.result_progress.connect(self._on_inference_progress)
 
+        # Batch timer
+        self._batch_timer.setSingleShot(True)
+        self._batch_timer.setInterval(_MAX_BATCH_DELAY_MS)
+        self._batch_timer.timeout.connect(self._dispatch_pending)
+
         # Kind combo
         self.cbb_kind.setEditable(False)
         self.cbb_kind.setInsertPolicy(QComboBox.InsertPolicy.NoInsert)
@@ -87,6 +107,7 @@ class ModelRunnerWidget(QWidget):
         # Model combo
         self.cbb_model.setEditable(False)
         self.cbb_model.setInsertPolicy(QComboBox.InsertPolicy.NoInsert)
+        self.cbb_model.currentIndexChanged.connect(self._on_select_model_changed)
         self._rebuild_model_list()
 
         # Buttons
@@ -130,46 +151,69 @@ class ModelRunnerWidget(QWidget):
     # End of def _log
 
 
+    @staticmethod
+    def _group_by_kind(models:list[ModelInfo]) -> dict[str, list[ModelInfo]]:
+        grouped:dict[str, list[ModelInfo]] = defaultdict(list)
+        for m in models:
+            grouped[m.kind.value].append(m)
+        return grouped
+    # End of staticmethod def _group_by_kind
+
+
     def _rebuild_model_list(self) -> None:
         """Populate combo"""
-        self.cbb_model.clear()
-        models = self.models.get(self.cbb_kind.currentText(), [])
-        for m in models:
-            txt = f"{m.name}"
-            self.cbb_model.addItem(txt)
-        #
-        if models:
-            self.cbb_model.setCurrentIndex(0)
-            self.btn_load.setEnabled(True)
-        else:
-            self.btn_load.setEnabled(False)
-        #
+        self._populating_models = True
+        try:
+            self.cbb_model.clear()
+            models = self.models.get(self.cbb_kind.currentText(), [])
+            for m in models:
+                txt = f"{m.name}"
+                self.cbb_model.addItem(txt)
+            #
+            if models:
+                self.cbb_model.setCurrentIndex(0)
+                self.btn_load.setEnabled(True)
+            else:
+                self.btn_load.setEnabled(False)
+            #
+        finally:
+            self._populating_models = False
     # End of def _rebuild_model_list
 
 
+    def _apply_state(self) -> None:
+        """Push the (loaded, running) state to the widgets, only if it changed since the last call."""
+        state = (self._model_loaded, self._model_running)
+        if state == self._applied_state:
+            return
+        self._applied_state = state
+        loaded, running = state
+        # Can't run without a model. Run stays enabled while running: image frames are queued for the next batch
+        self.setUpdatesEnabled(False)
+        try:
+            self.cbb_kind.setEnabled(not loaded)
+            self.cbb_model.setEnabled(not loaded)
+            self.btn_load.setEnabled(not loaded)
+            self.btn_unload.setEnabled(loaded and not running)
+            self.btn_run.setEnabled(loaded)
+        finally:
+            self.setUpdatesEnabled(True)
+    # End of def _apply_state
+
+
     def _set_loaded_state(self, loaded: bool) -> None:
-        self.cbb_kind.setEnabled(not loaded)
-        self.cbb_model.setEnabled(not loaded)
-        self.btn_load.setEnabled(not loaded)
-        self.btn_unload.setEnabled(loaded)
-        self.btn_run.setEnabled(loaded)
-        #
+        if loaded != self._model_loaded or self._applied_state is None:
+            self.lbl_status.setText("Model loaded" if loaded else "No model loaded")
         self._model_loaded = loaded
-        if loaded:
-            self.lbl_status.setText("Model loaded")
-        else:
-            self.lbl_status.setText("No model loaded")
+        self._model_running = False
+        self._apply_state()
     # End of def _set_loaded_state
 
 
     def _set_running_state(self, running: bool) -> None:
-        # Can't run without a model, but disable if already running
-        active = self._model_loaded and not running
-        self.btn_run.setEnabled(active)
-        self.btn_unload.setEnabled(active)
-        #
-        self._model_running = not active
-    # End of def _set_loaded_state
+        self._model_running = running
+        self._apply_state()
+    # End of def _set_running_state
 
 
     # --- --- --- Slots / callbacks --- --- ---
@@ -177,10 +221,30 @@ class ModelRunnerWidget(QWidget):
 
     @Slot()
     def _on_select_kind_changed(self) -> None:
+        # User changed the kind: the first model of the new list gets selected, warm it up
         self._rebuild_model_list()
+        self._warm_up_selected()
     # End of def _on_select_kind_changed
 
 
+    @Slot()
+    def _on_select_model_changed(self) -> None:
+        models = self.models.get(self.cbb_kind.currentText(), [])
+        idx = self.cbb_model.currentIndex()
+        self._selected = models[idx] if 0 <= idx < len(models) else None
+        # Not on the programmatic fill (e.g. startup): only warm up on user choices
+        if not self._populating_models:
+            self._warm_up_selected()
+    # End of def _on_select_model_changed
+
+
+    def _warm_up_selected(self) -> None:
+        """Start importing the selected wrapper now: Load then only pays for the weights."""
+        if self._selected is not None:
+            self.ctl_model.warm_up(self._selected.wrapper_name)
+    # End of def _warm_up_selected
+
+
     @Slot()
     def _on_load_clicked(self) -> None:
         # Get selected model
@@ -204,6 +268,8 @@ class ModelRunnerWidget(QWidget):
 
     @Slot()
     def _on_unload_clicked(self) -> None:
+        self._batch_timer.stop()
+        self._pending.clear()
         self.ctl_model.unload_model()
         self._set_loaded_state(loaded=False)
     # End of def _on_unload_clicked
@@ -224,13 +290,13 @@ class ModelRunnerWidget(QWidget):
 
         match model_info.kind:
             case ModelKind.IMAGE:
-                try:
-                    request_id = self._make_request_id(model_info.name)
-                    request = self._build_image_inference_request(request_id, current_frame_id)
-                except Exception as e:
-                    self._log(f"ModelRunnerWidget: failed to build InferenceInput for image: {e!r}")
-                    return
+                # Batched: the request is built and submitted by _dispatch_pending
+                self._enqueue_image_frame(current_frame_id)
+                return
             case ModelKind.VIDEO:
+                if self._model_running:
+                    self._log("Inference already running")
+                    return
                 try:
                     all_frames= self.ctl_frames.get_all_frame_ids()
                     request_id = self._make_request_id(model_info.name)
@@ -248,23 +314,60 @@ class ModelRunnerWidget(QWidget):
             return
 
 
-        # Indicate running state and emit started signal
-        if (msg := self.ctl_model.run_inference(request)) is not None:
-            self._log(f"ModelRunnerWidget: inference request failed: {msg}")
-            return
-        else:
-            self.result_inference_started.emit(request.request_id)
-            self._set_running_state(running=True)
+        self._submit(request)
     # End of def _on_run_clicked
 
 
+    @Slot()
+    def _dispatch_pending(self) -> None:
+        """Build one image request for the pending frames (up to the max batch size) and submit it. While running, wait for the current request to finish."""
+        self._batch_timer.stop()
+        if not self._pending or self._model_running:
+            return
+        # Checked before taking frames out of the queue: they stay pending for the next Run
+        if (model_info := self.get_selected_model()) is None:
+            self._log("No model selected")
+            return
+
+        frames: list[FrameID] = []
+        while self._pending and len(frames) < _MAX_BATCH_SIZE:
+            frames.append(self._pending.popleft())
+
+        # Failing frames are skipped by the builder: only a failure of the whole batch ends up here
+        try:
+            request_id = self._make_request_id(model_info.name)
+            request = self._build_image_inference_request(request_id, frames)
+        except Exception as e:
+            request = f"ModelRunnerWidget: failed to build InferenceInput for image: {e!r}"
+
+        if isinstance(request, str):
+            self._log(request)
+            # Nothing submitted, so no finished/error callback to dispatch the frames left behind
+            if self._pending:
+                self._batch_timer.start()
+            return
+
+        self._submit(request)
+    # End of def _dispatch_pending
+
+
     @Slot(InferenceResult)
     def _on_inference_finished(self, inf_result: InferenceResult) -> None:
         self._set_running_state(running=False)
         self.result_inference_finished.emit(inf_result)
         self.lbl_status.setText("Inference finished")
+        # Eager batching: whatever accumulated while running goes out now, without waiting for the timer
+        self._dispatch_pending()
     # End of def _on_inference_finished
 
+
+    @Slot(str, str)
+    def _on_inference_error(self, request_id: str, message: str) -> None:
+        self._set_running_state(running=False)
+        self._log(f"ModelRunnerWidget: inference request {request_id} failed: {message}")
+        self._dispatch_pending()
+    # End of def _on_inference_error
+
     
     @Slot(float, object)
     def _on_inference_progress(self, progress: float, message: str | None) -> None:
@@ -275,6 +378,32 @@ class ModelRunnerWidget(QWidget):
     # End of def _on_inference_progress
 
 
+    @Slot(object)
+    def _on_frame_annotations_changed(self, frame_id: FrameID) -> None:
+        self._frame_prompt_cache.pop(frame_id, None)
+    # End of def _on_frame_annotations_changed
+
+
+    def _enqueue_image_frame(self, frame_id: FrameID) -> None:
+        if frame_id not in self._pending:
+            self._pending.append(frame_id)
+        if self._model_running:
+            return # Dispatched as soon as the current request finishes
+        if len(self._pending) >= _MAX_BATCH_SIZE:
+            self._dispatch_pending()
+        elif not self._batch_timer.isActive():
+            self._batch_timer.start()
+    # End of def _enqueue_image_frame
+
+
+    def _submit(self, request: InferenceRequest) -> None:
+        # Indicate running state and emit started signal before submitting: errors may be reported synchronously
+        self._set_running_state(running=True)
+        self.result_inference_started.emit(request.request_id)
+        self.ctl_model.submit(request)
+    # End of def _submit
+
+
     def _make_request_id(self, model_type: str) -> str:
         rid = self._next_request_id
         self._next_request_id += 1
@@ -282,18 +411,80 @@ class ModelRunnerWidget(QWidget):
     # End of def _make_request_id
 
 
-    def _build_image_inference_request(self, request_id: str, frame_id: FrameID) -> InferenceRequest | str:
-        # Image path for this frame
-        if (image_path := self.ctl_frames.get_frame_path(frame_id)) is None:
-            raise RuntimeError("Frame controller returned no image path for requested frame")
+    def _build_image_inference_request(self, request_id: str, frames: list[FrameID]) -> InferenceRequest | str:
+        """
+        Build an InferenceRequest for a batch of independent images.
+        Frames without prompts or whose prompt cannot be built are skipped (logged), so that one bad frame does not drop the batch;
+        frame i of the request is prompted by the frame prompt with frame_index == i.
+        """
+        # 1) Per-frame prompts (local numeric instance ids), from the cache when the annotations did not change
+        per_frame: list[tuple[FrameID, Path, PVSFramePrompt, dict[int, InstanceID]]] = []
+        for frame_id in frames:
+            if (image_path := self.ctl_frames.get_frame_path(frame_id)) is None:
+                self._log(f"Skipping frame {int(frame_id)}: frame controller returned no image path")
+                continue
+
+            version = self.ctl_annotations.version_for_frame(frame_id)
+            if (cached := self._frame_prompt_cache.get(frame_id)) is not None and cached[0] == version:
+                _, frame_prompt, imap = cached
+            else:
+                try:
+                    frame_prompt_imap = self._build_image_frame_prompt(frame_id)
+                except ValueError as e: # Invalid prompts on this frame, e.g. more than one box per instance
+                    frame_prompt_imap = str(e)
+                if isinstance(frame_prompt_imap, str):
+                    self._log(f"Skipping frame {int(frame_id)}: {frame_prompt_imap}")
+                    continue
+                frame_prompt, imap = frame_prompt_imap
+                self._frame_prompt_cache[frame_id] = (version, frame_prompt, imap)
+            per_frame.append((frame_id, image_path, frame_prompt, imap))
+        # End for frame_id in ...
+
+        if not per_frame:
+            return "No clicks or bounding boxes on the requested frames"
+
+        # 2) Global numeric instance ids for the batch, and remap each frame prompt onto them
+        all_inst_ids: set[InstanceID] = set()
+        for _, _, _, imap in per_frame:
+            all_inst_ids.update(imap.values())
+        instance_mapping: dict[int, InstanceID] = dict(enumerate(sorted(all_inst_ids, key=str)))
+        instance_id_to_numeric: dict[InstanceID, int] = {inst_id: numeric_id for numeric_id, inst_id in instance_mapping.items()}
+
+        frame_prompts: list[PVSFramePrompt] = []
+        frame_paths: list[Path] = []
+        frame_mapping: dict[int, FrameID] = {}
+        for frame_index, (frame_id, image_path, frame_prompt, imap) in enumerate(per_frame):
+            instances = tuple(replace(inst, instance_id=instance_id_to_numeric[imap[inst.instance_id]]) for inst in frame_prompt.instances)
+            frame_prompts.append(PVSFramePrompt(frame_index=frame_index, instances=instances))
+            frame_paths.append(image_path)
+            frame_mapping[frame_index] = frame_id
+        #
+
+        # 3) Build Task -> InferenceInput -> InferenceRequest
+        # For now, simple default output options (TODO: make configurable in UI)
+        output_options = MaskOutputOptions()
+
+        # No video options: images are independent
+        task = PVSTask(frame_prompts=frame_prompts, video_options=None, output_options=output_options)
+
+        logger.debug("Image inference request built for %d frames, frame_paths=%s, instance mapping=%s", len(frame_prompts), frame_paths, instance_mapping)
+
+        input_data = InferenceInput(task_type=TaskType.PVS, task=task, frame_paths=frame_paths)
+
+        return InferenceRequest(request_id=request_id, frame_mapping=frame_mapping, instance_mapping=instance_mapping, input_data=input_data)
+    # End of def _build_image_inference_request
+
 
+    def _build_image_frame_prompt(self, frame_id: FrameID) -> tuple[PVSFramePrompt, dict[int, InstanceID]] | str:
+        """Build the image-mode frame prompt (frame_index = 0) and its numeric_id -> InstanceID mapping."""
         # --- collect point prompts per instance ---
+        # Hot loop on dense frames: bind class/enum locally, compare enum singletons by identity
+        _PointPrompt, _POS = PVSPointPrompt, PointKind.POSITIVE
         points_by_inst: dict[InstanceID, list[PVSPointPrompt]] = defaultdict(list)
         for pa in self.ctl_annotations.get_points_for_frame(frame_id):
-            x, y = pa.point.position
-            is_positive = (pa.point.kind == PointKind.POSITIVE)
-            inst_id: InstanceID = pa.instance_id
-            points_by_inst[inst_id].append( PVSPointPrompt(x=x, y=y, is_positive=is_positive))
+            p = pa.point
+            x, y = p.position
+            points_by_inst[pa.instance_id].append(_PointPrompt(x=x, y=y, is_positive=p.kind is _POS))
         # End for pa in ...
 
 
@@ -314,6 +505,7 @@ class ModelRunnerWidget(QWidget):
 
         # --- combine into PVS instance prompts ---
         instances: list[PVSInstancePrompt] = []
+        no_points: tuple[PVSPointPrompt, ...] = ()
         imap: dict[int, InstanceID] = {}  # numeric_id -> InstanceID
         all_inst_ids: set[InstanceID] = set(points_by_inst.keys()) | set(boxes_by_inst.keys())
         if not all_inst_ids:
@@ -322,26 +514,11 @@ class ModelRunnerWidget(QWidget):
         # Sort instances by 'str' id for stable ordering
         for numeric_id, inst_id in enumerate(sorted(all_inst_ids, key=str)):
             imap[numeric_id] = inst_id
-            instances.append( PVSInstancePrompt( instance_id=numeric_id, points=points_by_inst.get(inst_id, []), box=boxes_by_inst.get(inst_id)))
-
-        # --- build Task -> InferenceInput -> InferenceRequest ---
-        # For now, simple default output options (TODO: make configurable in UI)
-        output_options = MaskOutputOptions()
+            instances.append( PVSInstancePrompt( instance_id=numeric_id, points=tuple(points_by_inst.get(inst_id, no_points)), box=boxes_by_inst.get(inst_id)))
 
         # Image mode: one frame prompt, frame_index = 0 by convention
-        frame_prompt = PVSFramePrompt(frame_index=0, instances=instances)
-
-        # No video options for this widget (image-only)
-        task = PVSTask(frame_prompts=[frame_prompt], video_options=None, output_options=output_options)
-
-        print("Inference request built with", sum(len(p.points) for p in instances), "points and", sum(1 for p in instances if p.box is not None), "bboxes on frame", frame_id)
-        print("  image path:", image_path)
-        print("  instance mapping:", imap)
-
-        input_data = InferenceInput(task_type=TaskType.PVS, task=task, frame_paths=[image_path])
-
-        return InferenceRequest(request_id=request_id, frame_mapping={0: frame_id}, instance_mapping=imap, input_data=input_data)
-    # End of def _build_image_inference_request
+        return PVSFramePrompt(frame_index=0, instances=tuple(instances)), imap
+    # End of def _build_image_frame_prompt
 
 
     def _build_video_inference_request(self, request_id: str, frames:list[FrameID], video_options: PVSVideoOption | None = None) -> InferenceRequest | str:
@@ -390,17 +567,17 @@ class ModelRunnerWidget(QWidget):
 
         # 4) For each frame, collect prompts per instance and build PVSFramePrompt
         frame_prompts: list[PVSFramePrompt] = []
+        no_points: tuple[PVSPointPrompt, ...] = ()
+        _PointPrompt, _POS = PVSPointPrompt, PointKind.POSITIVE
+        get_points_for_frame = self.ctl_annotations.get_points_for_frame
 
         for frame_index, frame_id in enumerate(frames):
             # --- collect point prompts per InstanceID on this frame ---
             points_by_inst: dict[InstanceID, list[PVSPointPrompt]] = defaultdict(list)
-            for pa in self.ctl_annotations.get_points_for_frame(frame_id):
-                x, y = pa.point.position
-                is_positive = (pa.point.kind == PointKind.POSITIVE)
-                inst_id: InstanceID = pa.instance_id
-                points_by_inst[inst_id].append(
-                    PVSPointPrompt(x=x, y=y, is_positive=is_positive)
-                )
+            for pa in get_points_for_frame(frame_id):
+                p = pa.point
+                x, y = p.position
+                points_by_inst[pa.instance_id].append(_PointPrompt(x=x, y=y, is_positive=p.kind is _POS))
 
             # --- collect at-most-one positive box per InstanceID on this frame ---
             boxes_by_inst: dict[InstanceID, PVSBoxPrompt] = {}
@@ -423,9 +600,9 @@ class ModelRunnerWidget(QWidget):
             frame_instances: list[PVSInstancePrompt] = []
             for inst_id in sorted(inst_ids_for_frame, key=str):
                 numeric_id = instance_id_to_numeric[inst_id]
-                frame_instances.append(PVSInstancePrompt(instance_id=numeric_id, points=points_by_inst.get(inst_id, []), box=boxes_by_inst.get(inst_id)))
+                frame_instances.append(PVSInstancePrompt(instance_id=numeric_id, points=tuple(points_by_inst.get(inst_id, no_points)), box=boxes_by_inst.get(inst_id)))
 
-            frame_prompts.append(PVSFramePrompt(frame_index=frame_index, instances=frame_instances))
+            frame_prompts.append(PVSFramePrompt(frame_index=frame_index, instances=tuple(frame_instances)))
         # End of for frame_index, frame_id in ...
 
         if not frame_prompts:
@@ -437,9 +614,7 @@ class ModelRunnerWidget(QWidget):
 
         task = PVSTask( frame_prompts=frame_prompts, video_options=vo, output_options=output_options)
 
-        print( "Video inference request built with", len(frame_prompts), "frame prompts across", len(frames), "frames")
-        print("  frame_paths:", frame_paths)
-        print("  instance mapping:", instance_mapping)
+        logger.debug("Video inference request built with %d frame prompts across %d frames, frame_paths=%s, instance mapping=%s", len(frame_prompts), len(frames), frame_paths, instance_mapping)
 
         input_data = InferenceInput(task_type=TaskType.PVS, task=task, frame_paths=frame_paths)
 
@@ -451,18 +626,14 @@ class ModelRunnerWidget(QWidget):
     # --- --- --- Public helpers --- --- ---
 
     def get_selected_model(self) -> ModelInfo | None:
-        """Return the selected model_type,path string, or None if nothing selected."""
-        models = self.models.get(self.cbb_kind.currentText(), [])
-        idx = self.cbb_model.currentIndex()
-        if idx < 0 or idx >= len(models):
-            return None
-        return models[idx]
+        """Return the selected model, or None if nothing selected."""
+        return self._selected
     # End of def get_selected_model
 
 
-    def set_model_selection(self, model_paths: dict[str, Path]) -> None:
-        """ Replace the model registry at runtime and rebuild the combo.  Keys = model_type, values = Path.  """
-        self._model_paths = model_paths
+    def set_model_selection(self, models:list[ModelInfo]) -> None:
+        """Replace the model registry at runtime and rebuild the combo."""
+        self.models = ModelRunnerWidget._group_by_kind(models)
         self._rebuild_model_list()
     # End of def set_model_selection
 
@@ -1,7 +1,10 @@
 """Define the annotator scene (holding the data) to be de displayed in a view."""
 # --- --- --- Imports --- --- ---
 # STD
-from typing import cast
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Callable, cast
 from dataclasses import dataclass
 # 3RD
 from PySide6.QtCore import Qt, QObject, Signal, Slot, QRect, QRectF, QPointF, QPoint
@@ -11,18 +14,44 @@ from PySide6.QtGui import QKeyEvent, QEnterEvent, QFocusEvent, QResizeEvent
 from PySide6.QtWidgets import QGraphicsScene, QGraphicsPixmapItem, QGraphicsItem, QGraphicsSceneMouseEvent
 # Project
 from samnotator.controllers.annotations_controller import AnnotationsController
-from samnotator.controllers.instance_controller import InstanceController
-from samnotator.datamodel import FrameID, InstanceID, BBoxID, BBox, BBoxAnnotation
+from samnotator.controllers.instance_controller import InstanceController, InstanceInfo
+from samnotator.datamodel import FrameID, InstanceID, InstanceDetection, BBoxID, BBox, BBoxAnnotation
 from samnotator.datamodel import PointAnnotation, PointKind, PointID, PointXY, Point
 from samnotator.utils._CUD import CUD
 from samnotator.widgets.instances.instance_renderers import MaskMode
 from .items.qxitempoint import QXItemPoint
 from .items.bbox import QXItemBox, QXItemRect
 from .items.layer import Layer, LayerItem
+from samnotator.utils_qt.contextblock import block_signals
 from .base import ZValues, AnnotatorSceneProtocol
 
 
 
+# Point/bbox batches larger than this are applied with the scene signals blocked (see _batch_mutations)
+_BATCH_BLOCK_SIGNALS_THRESHOLD:int = 16
+
+# Mouse button -> kind of the created point/box
+_BTN_TO_KIND:dict[Qt.MouseButton, PointKind] = {Qt.MouseButton.LeftButton: PointKind.POSITIVE, Qt.MouseButton.RightButton: PointKind.NEGATIVE}
+# A drag becomes a box once it spans at least QXItemBox.MIN_SIZE in both directions (squared: no abs() per mouse event)
+_MIN_DRAG_SQ:int = QXItemBox.MIN_SIZE * QXItemBox.MIN_SIZE
+# Masks are rendered downsampled when at least this many mask pixels fall on one screen pixel
+_MIN_MASK_STEP:int = 3
+
+
+def _mask_step_for(view_scale:float) -> int:
+    """Mask downsampling step for a view scale (screen pixels per scene pixel): 1 means full resolution."""
+    step = int(1.0 / view_scale) if view_scale > 0 else 1
+    return step if step >= _MIN_MASK_STEP else 1
+# End of def _mask_step_for
+
+
+def _bbox_rect(bbox:BBox) -> QRect:
+    """QRect from inclusive corners, without building two intermediate QPoint."""
+    (x0, y0), (x1, y1) = bbox.top_left, bbox.bottom_right
+    return QRect(x0, y0, x1 - x0 + 1, y1 - y0 + 1)
+# End of def _bbox_rect
+
+
 # Note: annotator scene and items should be rework to ensure a better initialisation process, e.g. avoid controller call for the onchange slots in item.
 
 class AnnotatorScene(QGraphicsScene):
@@ -34,6 +63,7 @@ class AnnotatorScene(QGraphicsScene):
                  instance_controller:InstanceController,
                  frame_id:FrameID,
                  qpixmap:QPixmap,
+                 view_scale:float=1.0,
                  parent=None
     ) -> None:
         super().__init__(parent)
@@ -49,9 +79,27 @@ class AnnotatorScene(QGraphicsScene):
         self._drag_current_scene_pos: QPointF | None = None
         self._drag_box_preview: QXItemRect | None = None
         self._selected_items_on_press: set[QGraphicsItem]|None = None
+        # Mirror of selectedItems(), maintained from selectionChanged: no Qt enumeration on mouse press
+        self._selected_items: set[QGraphicsItem] = set()
+        # Instance whose layers are raised (see on_current_instance_changed)
+        self._selected_iid: InstanceID|None = None
         
         # Layers per instance
         self.instance_layers:dict[InstanceID, Layer] = {}
+        # Points occupancy of this frame, mirrors the controller: answer drag collision tests locally
+        self._occupancy:dict[PointXY, PointID] = {}
+        self._point_positions:dict[PointID, PointXY] = {}
+        # Inputs of the last rendered mask per instance: (detection, mode, main colour rgba, step)
+        self._mask_keys:dict[InstanceID, tuple[InstanceDetection|None, MaskMode, int, int]] = {}
+        # Masks downsampling step, following the view scale (see set_view_scale)
+        self._mask_step:int = _mask_step_for(view_scale)
+        # CUD dispatch tables for the controller slots
+        self._point_list_dispatch:dict[CUD, Callable[[list[PointAnnotation]], None]] = {CUD.CREATE: self.add_point_annotations, CUD.UPDATE: self._update_points, CUD.DELETE: self._delete_points}
+        self._bbox_list_dispatch:dict[CUD, Callable[[list[BBoxAnnotation]], None]] = {CUD.CREATE: self._create_bboxes, CUD.UPDATE: self._update_bboxes, CUD.DELETE: self._delete_bboxes}
+        self._instance_dispatch:dict[CUD, Callable[[InstanceID], None]] = {CUD.CREATE: self._create_instance_layer, CUD.UPDATE: self._update_instance_layer, CUD.DELETE: self._delete_instance_layer}
+        # Single item fast path (interactive click/drag): no grouping, batching or list iteration
+        self._point_dispatch:dict[CUD, Callable[[PointAnnotation], None]] = {CUD.CREATE: self.add_point_annotation, CUD.UPDATE: self.update_point_annotation, CUD.DELETE: lambda pa: self.delete_point_annotation(pa.point_id, pa.instance_id)}
+        self._bbox_dispatch:dict[CUD, Callable[[BBoxAnnotation], None]] = {CUD.CREATE: self.add_bbox_annotation, CUD.UPDATE: self.update_bbox_annotation, CUD.DELETE: self.delete_bbox_annotation}
 
         # Setup
         self._init_ui()
@@ -60,6 +108,21 @@ class AnnotatorScene(QGraphicsScene):
 
     def _init_ui(self) -> None:
         self.setSceneRect(self.qpixmap.rect())
+        # Fixed for the scene lifetime: plain floats for the item drag clamps (no QRectF round trip per mouse move)
+        self.scene_bounds:tuple[float, float, float, float] = self.sceneRect().getCoords()
+        self.setBackgroundBrush(Qt.BrushStyle.NoBrush)
+        # Frame as a bottom item (not drawBackground): Qt only repaints the part intersecting dirty regions
+        self._bg_item = QGraphicsPixmapItem(self.qpixmap)
+        self._bg_item.setZValue(ZValues.BACKGROUND)
+        self._bg_item.setTransformationMode(Qt.TransformationMode.FastTransformation) # No smoothing for pixel-perfect display
+        self._bg_item.setShapeMode(QGraphicsPixmapItem.ShapeMode.BoundingRectShape)   # No mask computation for hit tests
+        self._bg_item.setAcceptedMouseButtons(Qt.MouseButton.NoButton)                 # Clicks go to the scene (points/boxes)
+        self._bg_item.setCacheMode(QGraphicsItem.CacheMode.DeviceCoordinateCache)      # Static: re-blit the cache until zoom changes
+        self.addItem(self._bg_item)
+        # Few items (marks, boxes, masks per instance) but many moves: a linear scan beats maintaining the BSP tree
+        self.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.NoIndex)
+        # Connect: scene -> scene
+        self.selectionChanged.connect(self._on_selection_changed)
         # Connect: controller -> scene
         self.annotations_controller.point_list_changed.connect(self.on_point_list_changed)
         self.annotations_controller.bbox_list_changed.connect(self.on_bbox_list_changed)
@@ -69,10 +132,8 @@ class AnnotatorScene(QGraphicsScene):
         for instance_id in self.instance_controller.all_instance_ids():
             self.on_instance_changed(instance_id, CUD.CREATE)
             self.on_instance_changed(instance_id, CUD.UPDATE)  # To set visibility/marks
-        for pa in self.annotations_controller.get_points_for_frame(self.frame_id):
-            self.add_point_annotation(pa)
-        for ba in self.annotations_controller.get_bboxes_for_frame(self.frame_id):
-            self.add_bbox_annotation(ba)
+        self.add_point_annotations(self.annotations_controller.get_points_for_frame(self.frame_id))
+        self._create_bboxes(self.annotations_controller.get_bboxes_for_frame(self.frame_id))
     # End of def _init_ui
 
     
@@ -81,173 +142,331 @@ class AnnotatorScene(QGraphicsScene):
 
     @Slot(object, CUD)
     def on_point_list_changed(self, point_annotations:list[PointAnnotation], cud:CUD) -> None:
-        match cud:
-            case CUD.CREATE:
-                for pa in point_annotations:
-                    self.add_point_annotation(pa)
-            case CUD.UPDATE:
-                for pa in point_annotations:
-                    self.update_point_annotation(pa)
-            case CUD.DELETE:
-                for pa in point_annotations:
-                    self.delete_point_annotation(pa.point_id, pa.instance_id)
-            #
-        #
-    #
+        if len(point_annotations) == 1:
+            self._point_dispatch[cud](point_annotations[0])
+            return
+        with self._batch_mutations(len(point_annotations)):
+            self._point_list_dispatch[cud](point_annotations)
+    # End of def on_point_list_changed
+
 
     @Slot(object, CUD)
     def on_bbox_list_changed(self, bbox_annotations:list[BBoxAnnotation], cud:CUD) -> None:
-        match cud:
-            case CUD.CREATE:
-                for ba in bbox_annotations:
-                    self.add_bbox_annotation(ba)
-            case CUD.UPDATE:
-                for ba in bbox_annotations:
-                    self.update_bbox_annotation(ba)
-            case CUD.DELETE:
-                for ba in bbox_annotations:
-                    self.delete_bbox_annotation(ba)
-            #
-        #
+        if len(bbox_annotations) == 1:
+            self._bbox_dispatch[cud](bbox_annotations[0])
+            return
+        with self._batch_mutations(len(bbox_annotations)):
+            self._bbox_list_dispatch[cud](bbox_annotations)
     # End of def on_bbox_list_changed
 
 
-    @Slot(object, CUD)
+    @Slot(int, CUD)
     def on_instance_changed(self, instance_id:InstanceID, cud:CUD) -> None:
-        match cud:
-            case CUD.CREATE:
-                self.instance_layers[instance_id] = Layer.default(instance_id=instance_id)
-                self.addItem(self.instance_layers[instance_id].layer_mask)
-                self.addItem(self.instance_layers[instance_id].layer_bbox)
-                self.addItem(self.instance_layers[instance_id].layer_points)
-
-            case CUD.UPDATE:
-                instance = self.instance_controller.get(instance_id)
-                instance_layer = self.instance_layers[instance_id]
-
-                # --- Marks
-                # - Visibility
-                instance_layer.layer_points.setVisible(instance.show_markers)
-                instance_layer.layer_bbox.setVisible(instance.show_markers)
-                # - Update marks
-                mark_pixmaps_request:list[QPixmap] = instance.point_marks
-                if mark_pixmaps_request != instance_layer.markers:
-                    for item in instance_layer.point_items.values():
-                        item.set(mark_pixmaps_request[item.point_kind], None)
-
-                # --- Mask
-                # - Visbility
-                instance_layer.layer_mask.setVisible(instance.show_mask)
-                # - Update mask: for now, full re update
-                mask_mode = MaskMode.PLAIN if instance.show_plain_mask else MaskMode.FANCY
-                mask = self.instance_controller.get_mask_for(instance_id, self.frame_id, mask_mode)
-                if mask is not None:
-                    if instance_layer.mask is None: # New mask
-                        mask_item = QGraphicsPixmapItem(mask, parent = instance_layer.layer_mask)
-                        mask_item.setZValue(ZValues.MASK)  # behind points
-                        instance_layer.mask = mask_item
-                    else: # Update existing mask
-                        instance_layer.mask.setPixmap(mask)
-                    #
-                #
-                    
-            case CUD.DELETE:
-                instance_layer = self.instance_layers.pop(instance_id)
-                self.removeItem(instance_layer.layer_points)
-                self.removeItem(instance_layer.layer_bbox)
-                self.removeItem(instance_layer.layer_mask)
+        self._instance_dispatch[cud](instance_id)
+    # End of def on_instance_changed
+
+
+    # --- --- --- CUD handlers (see dispatch tables in __init__) --- --- ---
+
+    @contextmanager
+    def _batch_mutations(self, size:int) -> Iterator[None]:
+        """Large batches: no scene signals per item (the scene has no BSP index to maintain, see __init__).
+        No explicit repaint: Qt accumulates the dirty region of every touched item and processes it once, queued, after the batch
+        (that union is exact per view, including for ItemIgnoresTransformations marks).
+        """
+        if size <= _BATCH_BLOCK_SIGNALS_THRESHOLD:
+            yield
+            return
+        with block_signals(self):
+            yield
+        self._on_selection_changed() # selectionChanged was blocked: resync the selection mirror
+    # End of def _batch_mutations
+
+
+    @staticmethod
+    def _group_by_instance(point_annotations:list[PointAnnotation]) -> dict[InstanceID, list[PointAnnotation]]:
+        by_instance:dict[InstanceID, list[PointAnnotation]] = defaultdict(list)
+        for pa in point_annotations:
+            by_instance[pa.instance_id].append(pa)
+        return by_instance
+    # End of staticmethod def _group_by_instance
+
+
+    def _update_points(self, point_annotations:list[PointAnnotation]) -> None:
+        """Batched update_point_annotation: layer, items and marks are fetched once per instance."""
+        set_occupancy = self._set_occupancy
+        for iid, pas in self._group_by_instance(point_annotations).items():
+            layer = self.instance_layers[iid]
+            items, marks = layer.point_items, layer.point_marks
+            for pa in pas:
+                pid, kind, xy = pa.point_id, pa.point.kind, pa.point.position
+                item = items[pid]
+                item.set(pixmap=marks[kind] if kind != item.point_kind else None, kind=kind, point_xy=xy)
+                set_occupancy(pid, xy)
+        #
+    # End of def _update_points
+
+
+    def _delete_points(self, point_annotations:list[PointAnnotation]) -> None:
+        """Batched delete_point_annotation: layer and items are fetched once per instance."""
+        set_occupancy, remove_item = self._set_occupancy, self.removeItem
+        for iid, pas in self._group_by_instance(point_annotations).items():
+            items = self.instance_layers[iid].point_items
+            for pa in pas:
+                pid = pa.point_id
+                remove_item(items.pop(pid))
+                set_occupancy(pid, None)
+        #
+    # End of def _delete_points
+
+
+    def _create_bboxes(self, bbox_annotations:list[BBoxAnnotation]) -> None:
+        infos:dict[InstanceID, InstanceInfo] = {}
+        for ba in bbox_annotations:
+            iid = ba.instance_id
+            if (info := infos.get(iid)) is None:
+                info = infos[iid] = self._shown_instance(iid)
+            self.add_bbox_annotation(ba, info)
+    # End of def _create_bboxes
+
+
+    def _update_bboxes(self, bbox_annotations:list[BBoxAnnotation]) -> None:
+        get = self.instance_controller.get
+        infos:dict[InstanceID, InstanceInfo] = {}
+        for ba in bbox_annotations:
+            iid = ba.instance_id
+            if (info := infos.get(iid)) is None:
+                info = infos[iid] = get(iid)
+            self.update_bbox_annotation(ba, info)
+    # End of def _update_bboxes
+
+
+    def _delete_bboxes(self, bbox_annotations:list[BBoxAnnotation]) -> None:
+        for ba in bbox_annotations:
+            self.delete_bbox_annotation(ba)
+    # End of def _delete_bboxes
+
+
+    def _create_instance_layer(self, instance_id:InstanceID) -> None:
+        # The mask layer is only added to the scene with the first mask (see _update_instance_layer)
+        layer = Layer.default(instance_id=instance_id)
+        instance = self.instance_controller.get(instance_id)
+        layer.point_marks, layer.markers_version = instance.point_marks, instance.marks_version
+        if instance_id == self._selected_iid:
+            self._set_layer_raised(layer, True)
+        self.instance_layers[instance_id] = layer
+        self.addItem(self.instance_layers[instance_id].layer_bbox)
+        self.addItem(self.instance_layers[instance_id].layer_points)
+    # End of def _create_instance_layer
+
+
+    def _update_instance_layer(self, instance_id:InstanceID) -> None:
+        instance = self.instance_controller.get(instance_id)
+        instance_layer = self.instance_layers[instance_id]
+
+        # --- Marks
+        # - Visibility
+        instance_layer.layer_points.setVisible(instance.show_markers)
+        instance_layer.layer_bbox.setVisible(instance.show_markers)
+        # - Update marks
+        # Marks are only rebuilt by the controller on size/colour change, which bumps their version
+        if instance.marks_version != instance_layer.markers_version:
+            marks = instance.point_marks
+            point_items = instance_layer.point_items
+            with self._batch_mutations(len(point_items)):
+                for item in point_items.values():
+                    item.set(marks[item.point_kind], None)
+            instance_layer.point_marks, instance_layer.markers_version = marks, instance.marks_version
+
+        # --- Mask
+        # - Visbility
+        instance_layer.layer_mask.setVisible(instance.show_mask)
+        # - Hidden: keep the current item as is, render only when shown again (the key check below catches what changed meanwhile)
+        if not instance.show_mask:
+            return
+        # - Update mask: only re-render if the detection, mode or colour changed since the last render
+        mask_mode = MaskMode.PLAIN if instance.show_plain_mask else MaskMode.FANCY
+        detection = instance.instance.detections.get(self.frame_id)
+        colour_key = instance.main_colour.rgba()
+        step = self._mask_step
+        old_key = self._mask_keys.get(instance_id)
+        if old_key is not None and old_key[0] is detection and old_key[1] == mask_mode and old_key[2] == colour_key and old_key[3] == step:
+            return
+        self._mask_keys[instance_id] = (detection, mask_mode, colour_key, step)
+        # Only the area covered by the mask is rendered: the pixmap is placed at its offset in the frame
+        # When zoomed out, it is rendered downsampled and the item scaled back up (offset is in downsampled pixels too)
+        patch = self.instance_controller.get_mask_patch_for(instance_id, self.frame_id, mask_mode, step)
+        if patch is not None:
+            mask, offset = patch
+            if instance_layer.mask is None: # New mask
+                if instance_layer.layer_mask.scene() is None:
+                    self.addItem(instance_layer.layer_mask)
+                mask_item = QGraphicsPixmapItem(mask, parent = instance_layer.layer_mask)
+                mask_item.setZValue(ZValues.MASK)  # behind points
+                mask_item.setCacheMode(QGraphicsItem.CacheMode.DeviceCoordinateCache) # setPixmap invalidates the cache
+                instance_layer.mask = mask_item
+            else: # Update existing mask
+                instance_layer.mask.setPixmap(mask)
             #
+            instance_layer.mask.setOffset(QPointF(offset))
+            instance_layer.mask.setScale(step)
         #
-    #
+    # End of def _update_instance_layer
+
+
+    def set_view_scale(self, view_scale:float) -> None:
+        """Follow the scale of the view: re-render the masks if their downsampling step changes."""
+        step = _mask_step_for(view_scale)
+        if step != self._mask_step:
+            self._mask_step = step
+            for instance_id in self.instance_layers:
+                self._update_instance_layer(instance_id)
+    # End of def set_view_scale
+
+
+    def _delete_instance_layer(self, instance_id:InstanceID) -> None:
+        instance_layer = self.instance_layers.pop(instance_id)
+        self._mask_keys.pop(instance_id, None)
+        # The views use BoundingRectViewportUpdate: the dirty regions of the removals are merged into one bounded repaint
+        self.removeItem(instance_layer.layer_points)
+        self.removeItem(instance_layer.layer_bbox)
+        if instance_layer.layer_mask.scene() is self:
+            self.removeItem(instance_layer.layer_mask)
+    # End of def _delete_instance_layer
 
 
     @Slot(object)
     def on_current_instance_changed(self, instance_id:InstanceID|None) -> None:
         """Set the instance with `instance_id` as selected (or None for no selection), updating Z values accordingly."""
-        self.clearSelection()
-        for iid, layer in self.instance_layers.items():
-            if iid == instance_id:
-                layer.layer_points.setZValue(ZValues.SELECTED_POINTS)
-                layer.layer_bbox.setZValue(ZValues.SELECTED_BBOX)
-            else:
-                layer.layer_points.setZValue(ZValues.POINTS)
-                layer.layer_bbox.setZValue(ZValues.BBOX)
-            #
+        if self._selected_items: # Avoid a selectionChanged emission when nothing is selected
+            self.clearSelection()
+        if instance_id == self._selected_iid:
+            return
+        # Only the previous and the new selected layers change
+        if self._selected_iid is not None and (old_layer := self.instance_layers.get(self._selected_iid)) is not None:
+            self._set_layer_raised(old_layer, False)
+        if instance_id is not None and (new_layer := self.instance_layers.get(instance_id)) is not None:
+            self._set_layer_raised(new_layer, True)
+        self._selected_iid = instance_id
     # End of def select_layer
 
 
-    # --- --- --- Display --- --- ---
-
-    def drawBackground(self, painter: QPainter, rect: QRectF):
-        if not self.qpixmap.isNull():
-            # No smoothing for pixel-perfect display
-            painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform, False)
-            painter.drawPixmap(0, 0, self.qpixmap)
-    # End of def drawBackground
+    @staticmethod
+    def _set_layer_raised(layer:Layer, raised:bool) -> None:
+        """Put the points and bbox layers of an instance above (raised) or among the other instances."""
+        layer.layer_points.setZValue(ZValues.SELECTED_POINTS if raised else ZValues.POINTS)
+        layer.layer_bbox.setZValue(ZValues.SELECTED_BBOX if raised else ZValues.BBOX)
+    # End of staticmethod def _set_layer_raised
+
+
+    def add_point_annotations(self, point_annotations:list[PointAnnotation]) -> None:
+        """Batched add_point_annotation: instance info and marks are fetched once per instance."""
+        for iid, pas in self._group_by_instance(point_annotations).items():
+            self._shown_instance(iid)
+            # Create items in the instance layer
+            layer = self.instance_layers[iid]
+            marks = layer.point_marks
+            # One check per batch instead of one per point (elided under -O)
+            assert layer.point_items.keys().isdisjoint(pa.point_id for pa in pas), "Point ID already exists in the scene."
+            for pa in pas:
+                pid = pa.point_id
+                layer.point_items[pid] = QXItemPoint(pid, pa.point.kind, iid, marks[pa.point.kind], pa.point.position, parent=layer.layer_points)
+                self._set_occupancy(pid, pa.point.position)
+        #
+    # End of def add_point_annotations
 
 
-    def add_point_annotation(self, pa:PointAnnotation) -> None:
-        pid, iid = pa.point_id, pa.instance_id
-        kind = pa.point.kind
-        # Set visibility according to instance settings
+    def _shown_instance(self, iid:InstanceID) -> InstanceInfo:
+        """Instance info for iid, after turning its markers on if needed: adding an annotation makes the instance visible."""
         instance = self.instance_controller.get(iid)
         if not instance.show_markers:
             self.instance_controller.update_instance(iid, show_markers=True)
-        # Create item in its layer
+            instance = self.instance_controller.get(iid)
+        return instance
+    # End of def _shown_instance
+
+
+    def add_point_annotation(self, pa:PointAnnotation, instance:InstanceInfo|None=None) -> None:
+        """Add one point item. `instance` may be given by batch callers that already resolved (and showed) the instance."""
+        pid, iid = pa.point_id, pa.instance_id
         layer = self.instance_layers[iid]
+        kind = pa.point.kind
+        if instance is None:
+            self._shown_instance(iid)
+        # Create item in its layer
         assert pid not in layer.point_items, f"Point ID {pid} already exists in the scene."
-        mark:QPixmap = self.instance_controller.get(iid).point_marks[kind]
+        mark:QPixmap = layer.point_marks[kind]
         point_item = QXItemPoint(pid, kind, iid, mark, pa.point.position, parent=layer.layer_points)
         layer.point_items[pid] = point_item
+        self._set_occupancy(pid, pa.point.position)
     # End of def add_point_annotation
 
     
     def update_point_annotation(self, pa:PointAnnotation) -> None:
+        layer = self.instance_layers[pa.instance_id]
         kind = pa.point.kind
-        mark:QPixmap = self.instance_controller.get(pa.instance_id).point_marks[kind]
-        self.instance_layers[pa.instance_id].point_items[pa.point_id].set(pixmap=mark, kind=kind, point_xy=pa.point.position)
+        item = layer.point_items[pa.point_id]
+        # Marks are kept up to date by _update_instance_layer: only swap the pixmap when the kind changed (not on moves)
+        mark:QPixmap|None = layer.point_marks[kind] if kind != item.point_kind else None
+        item.set(pixmap=mark, kind=kind, point_xy=pa.point.position)
+        self._set_occupancy(pa.point_id, pa.point.position)
     # End of def update_point_annotation
 
 
     def delete_point_annotation(self, pid:PointID, iid:InstanceID) -> None:
-        layer = self.instance_layers[iid]
-        assert pid in layer.point_items, f"Point ID {pid} does not exist in the scene."
-        point_item = layer.point_items.pop(pid)
+        # Unknown id: pop raises KeyError, no separate containment check needed
+        point_item = self.instance_layers[iid].point_items.pop(pid)
         self.removeItem(point_item)
+        self._set_occupancy(pid, None)
     # End of def delete_point_annotation
 
 
-    def add_bbox_annotation(self, ba:BBoxAnnotation) -> None:
+    def _set_occupancy(self, pid:PointID, xy:PointXY|None) -> None:
+        """Move (or remove if xy is None) a point in the local occupancy map."""
+        # Within a batch, another point may already have taken old_xy (e.g. two points swapping): only free it if still ours
+        if (old_xy := self._point_positions.pop(pid, None)) is not None and self._occupancy.get(old_xy) == pid:
+            del self._occupancy[old_xy]
+        if xy is not None:
+            self._point_positions[pid] = xy
+            self._occupancy[xy] = pid
+    # End of def _set_occupancy
+
+
+    def point_can_move(self, point_id:PointID, xy:PointXY) -> bool:
+        """Return True if the point can move to xy in this frame, i.e. xy is free or already occupied by the point itself."""
+        return self._occupancy.get(xy, point_id) == point_id
+    # End of def point_can_move
+
+
+    def add_bbox_annotation(self, ba:BBoxAnnotation, instance:InstanceInfo|None=None) -> None:
+        """Add one bbox item. `instance` may be given by batch callers that already resolved (and showed) the instance."""
         bid, iid = ba.bbox_id, ba.instance_id
         bbox = ba.bbox
-        # Set visibility according to instance settings
-        instance = self.instance_controller.get(iid)
-        if not instance.show_markers:
-            self.instance_controller.update_instance(iid, show_markers=True)
+        if instance is None:
+            instance = self._shown_instance(iid)
         # Create item in its layer
         layer = self.instance_layers[iid]
         assert bid not in layer.bbox_items, f"BBox ID {bid} already exists in the scene."
-        rect = QRect(QPoint(*bbox.top_left), QPoint(*bbox.bottom_right))
-        instance_info = self.instance_controller.get(iid)
-        box_item = QXItemBox(box_id=bid, kind=bbox.kind, instance_info=instance_info, bbox=rect, parent=layer.layer_bbox)
+        rect = _bbox_rect(bbox)
+        box_item = QXItemBox(box_id=bid, kind=bbox.kind, instance_info=instance, bbox=rect, parent=layer.layer_bbox)
         layer.bbox_items[bid] = box_item
     # End of def add_bbox_annotation
 
     
-    def update_bbox_annotation(self, ba:BBoxAnnotation) -> None:
+    def update_bbox_annotation(self, ba:BBoxAnnotation, instance:InstanceInfo|None=None) -> None:
         bbox = ba.bbox
         kind = bbox.kind
-        rect = QRect(QPoint(*bbox.top_left), QPoint(*bbox.bottom_right))
-        iinfo = self.instance_controller.get(ba.instance_id)
-        self.instance_layers[ba.instance_id].bbox_items[ba.bbox_id].set(rect, kind, iinfo)
+        rect = _bbox_rect(bbox)
+        if instance is None:
+            instance = self.instance_controller.get(ba.instance_id)
+        self.instance_layers[ba.instance_id].bbox_items[ba.bbox_id].set(rect, kind, instance)
     # End of def update_bbox_annotation
 
     
     def delete_bbox_annotation(self, ba:BBoxAnnotation) -> None:
         bid = ba.bbox_id
-        layer = self.instance_layers[ba.instance_id]
-        assert bid in layer.bbox_items, f"BBox ID {bid} does not exist in the scene."
-        box_item = layer.bbox_items.pop(bid)
+        # Unknown id: pop raises KeyError, no separate containment check needed
+        box_item = self.instance_layers[ba.instance_id].bbox_items.pop(bid)
         self.removeItem(box_item)
     # End of def delete_bbox_annotation
 
@@ -255,25 +474,31 @@ class AnnotatorScene(QGraphicsScene):
     # --- --- --- Overrides --- --- ---
 
     def _reset_drag(self) -> None:
+        # Keep the preview item for the next drag: hide it rather than remove/recreate it
         if self._drag_box_preview is not None:
-            self.removeItem(self._drag_box_preview)
-        self._drag_box_preview = None
+            self._drag_box_preview.setVisible(False)
         self._drag_button = None
         self._drag_start_scene_pos = None
         self._drag_current_scene_pos = None
     # End of def reset_drag
 
 
+    @Slot()
+    def _on_selection_changed(self) -> None:
+        self._selected_items = set(self.selectedItems())
+    # End of def _on_selection_changed
+
+
     def mousePressEvent(self, event: QGraphicsSceneMouseEvent) -> None:
         # 1) Store select states: allow to tune behaviour when "click on empty" in release button
-        self._selected_items_on_press = set(self.selectedItems())
+        self._selected_items_on_press = self._selected_items.copy() if self._selected_items else None
 
         # 2) Let existing items (points, background, etc.) handle the event first
         super().mousePressEvent(event)
 
         # 3) Start potential box drag; we decide "box vs point" on release
         btn = event.button()
-        if btn in (Qt.MouseButton.LeftButton, Qt.MouseButton.RightButton) and not event.isAccepted():
+        if btn in _BTN_TO_KIND and not event.isAccepted():
             self._drag_button = btn
             scene_pos = event.scenePos()
             self._drag_start_scene_pos = scene_pos
@@ -305,21 +530,24 @@ class AnnotatorScene(QGraphicsScene):
         dy = current.y() - start.y()
 
         # Only consider it a box drag if we exceed min size in BOTH directions
-        if abs(dx) < QXItemBox.MIN_SIZE or abs(dy) < QXItemBox.MIN_SIZE:
+        if dx*dx < _MIN_DRAG_SQ or dy*dy < _MIN_DRAG_SQ:
             if self._drag_box_preview is not None: # This is not the end of the drag, just too small to show
-                self.removeItem(self._drag_box_preview)
-                self._drag_box_preview = None
+                self._drag_box_preview.setVisible(False)
             return
 
         # Create/update preview rectangle (real box is created on release via controller)
         rect = QRectF(start, current).normalized()
-        kind = PointKind.POSITIVE if self._drag_button == Qt.MouseButton.LeftButton else PointKind.NEGATIVE
-        if self._drag_box_preview is None:
-            self._drag_box_preview = QXItemRect(rect, main_colour=iinfo.main_colour, contrast_colour=iinfo.contrast_colour, kind=kind)
-            self._drag_box_preview.setZValue(ZValues.DRAG_BOX_PREVIEW)
-            self.addItem(self._drag_box_preview)
-        else:
-            self._drag_box_preview.setRect(rect)
+        kind = _BTN_TO_KIND[self._drag_button]
+        preview = self._drag_box_preview
+        if preview is None:
+            preview = self._drag_box_preview = QXItemRect(rect, main_colour=iinfo.main_colour, contrast_colour=iinfo.contrast_colour, kind=kind)
+            preview.setZValue(ZValues.DRAG_BOX_PREVIEW)
+            self.addItem(preview)
+        else: # Recycled: the current instance or button may differ from the last drag (painted with the new rect below)
+            preview.kind = kind
+            preview.set_colors(main=iinfo.main_colour, contrast=iinfo.contrast_colour)
+            preview.setRect(rect)
+            preview.setVisible(True)
         #
 
         event.accept()
@@ -331,7 +559,7 @@ class AnnotatorScene(QGraphicsScene):
 
         # Get button; if not left/right, ignore, reset drag state
         btn = event.button()
-        if btn not in (Qt.MouseButton.LeftButton, Qt.MouseButton.RightButton):
+        if (kind := _BTN_TO_KIND.get(btn)) is None:
             return self._reset_drag()
 
         # No drag state: treat as normal scene release. ensure drag state is reset
@@ -349,7 +577,7 @@ class AnnotatorScene(QGraphicsScene):
         end = event.scenePos().toPoint()
         dx = end.x() - start.x()
         dy = end.y() - start.y()
-        is_drag = abs(dx) >= QXItemBox.MIN_SIZE and abs(dy) >= QXItemBox.MIN_SIZE
+        is_drag = dx*dx >= _MIN_DRAG_SQ and dy*dy >= _MIN_DRAG_SQ
 
         # Clear drag state
         self._reset_drag()
@@ -365,7 +593,6 @@ class AnnotatorScene(QGraphicsScene):
         if not is_drag:
             scene_pos = event.scenePos()
             xy = PointXY((int(scene_pos.x()), int(scene_pos.y())))
-            kind = PointKind.POSITIVE if btn == Qt.MouseButton.LeftButton else PointKind.NEGATIVE
             point = Point(position=xy, kind=kind)
             self.annotations_controller.create_point(self.frame_id, iid, point)
             event.accept()
@@ -373,7 +600,6 @@ class AnnotatorScene(QGraphicsScene):
             rect = QRect(start, end).normalized()
             top_left = PointXY(rect.topLeft().toTuple())
             bottom_right = PointXY(rect.bottomRight().toTuple())
-            kind = PointKind.POSITIVE if btn == Qt.MouseButton.LeftButton else PointKind.NEGATIVE
             bbox = BBox(top_left=top_left, bottom_right=bottom_right, kind=kind)
             self.annotations_controller.create_bbox(self.frame_id, iid, bbox)
 
@@ -384,15 +610,19 @@ class AnnotatorScene(QGraphicsScene):
     def keyPressEvent(self, event: QKeyEvent) -> None:
         # Delete selected points on Delete/Backspace
         if event.key() in (Qt.Key.Key_Delete, Qt.Key.Key_Backspace):
-            did_delete:bool = False
-            for item in self.selectedItems():
+            # One batched controller call per kind: a single signal (and scene batch) for N deletions
+            point_ids:list[PointID] = []
+            bbox_ids:list[BBoxID] = []
+            for item in self._selected_items:
                 if isinstance(item, QXItemPoint):
-                    did_delete = True
-                    self.annotations_controller.delete_point(item.point_id)
+                    point_ids.append(item.point_id)
                 elif isinstance(item, QXItemBox):
-                    did_delete = True
-                    self.annotations_controller.delete_bbox(item.box_id)
-            if did_delete: # If we deleted something, accept the event and stop propagation
+                    bbox_ids.append(item.box_id)
+            if point_ids:
+                self.annotations_controller.delete_point_list(point_ids)
+            if bbox_ids:
+                self.annotations_controller.delete_bbox_list(bbox_ids)
+            if point_ids or bbox_ids: # If we deleted something, accept the event and stop propagation
                 event.accept()
                 return
         # Anything else (or nothing selected): normal behavior
@@ -1,6 +1,7 @@
 """Graphic view for the annotator, containing the annotator scene."""
 # --- --- --- Imports --- --- ---
 # STD
+from math import ceil
 from typing import Callable
 # 3RD
 from PySide6.QtCore import Qt, QTimer, Signal, Slot, QPoint, QPointF, QRectF, QRect, QSize, QSizeF
@@ -68,6 +69,8 @@ class AnnotatorView(InputMappedMixin, QGraphicsView):
         self.setTransformationAnchor(QGraphicsView.ViewportAnchor.NoAnchor)
         self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOn)
         self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOn)
+        # Coalesce all dirty regions of a pass into one rect: one repaint for restacks/batches instead of many small ones
+        self.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.BoundingRectViewportUpdate)
 
         # --- --- --- Zoom --- --- ---
         self._zoom_state = ViewZoomState(zoom_changed=self.zoom_changed, parent=self)
@@ -78,6 +81,7 @@ class AnnotatorView(InputMappedMixin, QGraphicsView):
 
         # --- --- --- Transform tracking --- --- ---
         self._new_transform = False
+        self._view_scale:float = 1.0 # Uniform scale of the current transform (set in zoom_set)
 
         # --- --- --- Mouse Tracking --- --- ---
         self.setMouseTracking(True)
@@ -85,11 +89,14 @@ class AnnotatorView(InputMappedMixin, QGraphicsView):
         self._pending_mouse_pos:QPointF | None = None
         self._hl_update_timer = QTimer(self)
         self._hl_update_timer.setSingleShot(True)
+        self._hl_update_timer.setTimerType(Qt.TimerType.PreciseTimer) # Coarse timers can be off by several ms at this rate
         self._hl_update_timer.setInterval(15) # 60 FPS
         self._hl_update_timer.timeout.connect(self._hl_process_move)
         # Tracking position in scene and corresponding rectangle in the view
         self._hl_scene_pos: QPoint | None = None
         self._hl_view_rect: QRect | None = None
+        # Highlighted scene pixel, moved in place (valid when _hl_scene_pos is not None)
+        self._hl_rect = QRectF(0, 0, 1, 1)
         # Compute once Highlight pens
         self._hl_width_bg:int = 3
         self._hl_pen_bg = QPen(Qt.GlobalColor.black)
@@ -117,11 +124,20 @@ class AnnotatorView(InputMappedMixin, QGraphicsView):
     def zoom_set(self, zi:ZoomInfo)->None:
         s = zi.wanted_level / 100.0
         self.setTransform(QTransform().scale(s, s))
+        self._view_scale = self.transform().m11()
+        if isinstance(scene := self.scene(), AnnotatorScene):
+            scene.set_view_scale(self._view_scale)
         self._zoom_state.set(zi)
         self._new_transform = True
     # End of def zoom_set_scale
 
 
+    def view_scale(self) -> float:
+        """Current uniform scale of the view (screen pixels per scene pixel)."""
+        return self._view_scale
+    # End of def view_scale
+
+
     @Slot(ZoomInfo, object) # QPoint|None
     def zoom_to_anchor(self, zi:ZoomInfo, anchor_view_position: QPoint|None)->None:
         if anchor_view_position is None:
@@ -145,9 +161,10 @@ class AnnotatorView(InputMappedMixin, QGraphicsView):
     # --- --- --- Highlight management --- --- ---
 
     def _hl_map_rect_from_scene(self, scene_rect:QRectF) -> QRect:
+        # The view only scales (uniformly): one mapped corner plus the scaled pixel size is enough
         top_left = self.mapFromScene(scene_rect.topLeft())
-        bottom_right = self.mapFromScene(scene_rect.bottomRight())
-        return QRect(top_left, bottom_right).normalized()
+        s = ceil(self._view_scale * scene_rect.width())
+        return QRect(top_left.x(), top_left.y(), s, s)
 
 
     def _hl_process_move(self):
@@ -158,33 +175,45 @@ class AnnotatorView(InputMappedMixin, QGraphicsView):
         # Reset pending
         self._pending_mouse_pos = None
 
+        # New scene pixel (None if outside): nothing to do if the mouse stayed in the same pixel and the view did not change
+        new_scene_pos = self.mapToScene(new_position.toPoint())
+        new_hl_pos = QPoint(int(new_scene_pos.x()), int(new_scene_pos.y())) if self.sceneRect().contains(new_scene_pos) else None
+        old_hl_pos = self._hl_scene_pos
+        same_pixel = (new_hl_pos is None) if old_hl_pos is None else (new_hl_pos is not None and new_hl_pos == old_hl_pos)
+        if same_pixel and not self._new_transform:
+            return
+
         # Old rectangle must be repainted
         dirty_rect = self._hl_view_rect
 
         # New info
-        new_scene_pos = self.mapToScene(new_position.toPoint())
-        if not self.sceneRect().contains(new_scene_pos):
+        if new_hl_pos is None:
             self._hl_scene_pos = None
             self._hl_view_rect = None
         else:
-            self._hl_scene_pos = QPoint(int(new_scene_pos.x()), int(new_scene_pos.y()))
-            self._hl_view_rect = self._hl_map_rect_from_scene(QRectF(self._hl_scene_pos, QSize(1, 1)))
-
-        # Dirty rect made of the old and new highlight rectangles
-        if dirty_rect is None:
-            dirty_rect = self._hl_view_rect
-        elif self._hl_view_rect is not None:
-            dirty_rect = dirty_rect.united(self._hl_view_rect)
+            self._hl_scene_pos = new_hl_pos
+            self._hl_rect.moveTopLeft(QPointF(self._hl_scene_pos))
+            self._hl_view_rect = self._hl_map_rect_from_scene(self._hl_rect)
 
         # Request repaint
         if self._new_transform:
+            # The whole viewport is repainted: no dirty rect to build
             self.viewport().update()
             self._new_transform = False
-        elif dirty_rect is not None:
-            # Expand dirty rect to account for pen width
-            expand_by = self._hl_width_bg
-            dirty_rect = dirty_rect.adjusted(-expand_by, -expand_by, expand_by, expand_by)
-            self.viewport().update(dirty_rect)
+        else:
+            # Dirty rect made of the old and new highlight rectangles
+            if dirty_rect is None:
+                dirty_rect = self._hl_view_rect
+            elif self._hl_view_rect is not None:
+                dirty_rect = dirty_rect.united(self._hl_view_rect)
+            if dirty_rect is not None:
+                # Expand dirty rect to account for pen width, keep the part that is on screen
+                expand_by = self._hl_width_bg
+                dirty_rect = dirty_rect.adjusted(-expand_by, -expand_by, expand_by, expand_by)
+                dirty_rect = dirty_rect.intersected(self.viewport().rect())
+                if not dirty_rect.isEmpty():
+                    self.viewport().update(dirty_rect)
+        #
 
         # Signal
         sp = self._hl_scene_pos
@@ -193,14 +222,15 @@ class AnnotatorView(InputMappedMixin, QGraphicsView):
 
     def _hl_draw(self, painter:QPainter)->None:
         if self._hl_scene_pos is not None:
-            scene_rect = QRectF(self._hl_scene_pos, QSize(1, 1))
+            # Two colours need two strokes; pens and rect are persistent, nothing is allocated per paint
+            hl_rect = self._hl_rect
             painter.save()
             painter.setRenderHint(QPainter.RenderHint.Antialiasing, False)
             painter.setBrush(Qt.BrushStyle.NoBrush)
             painter.setPen(self._hl_pen_bg)
-            painter.drawRect(scene_rect)
+            painter.drawRect(hl_rect)
             painter.setPen(self._hl_pen_fg)
-            painter.drawRect(scene_rect)
+            painter.drawRect(hl_rect)
             painter.restore()
 
 
@@ -208,7 +238,11 @@ class AnnotatorView(InputMappedMixin, QGraphicsView):
 
     def drawForeground(self, painter:QPainter, rect:QRectF | QRect):
         super().drawForeground(painter, rect)
-        self._hl_draw(painter)
+        # Most repaints (item moves, masks, batches) do not touch the highlight cell: no painter state churn for those
+        if self._hl_scene_pos is not None:
+            margin = self._hl_width_bg / max(self._view_scale, 1e-6) # Cosmetic pen width, in scene units
+            if QRectF(rect).intersects(self._hl_rect.adjusted(-margin, -margin, margin, margin)):
+                self._hl_draw(painter)
 
 
     def setScene(self, scene: AnnotatorScene | None) -> None:
@@ -1,10 +1,8 @@
 """Main annotator widget"""
 # --- --- --- Imports --- --- ---
 # STD
-from dataclasses import replace
 # 3RD
 from PySide6.QtCore import Signal
-from PySide6.QtGui import QPixmap
 from PySide6.QtWidgets import QWidget, QComboBox, QVBoxLayout, QHBoxLayout, QPushButton, QSizePolicy
 # Project
 from samnotator.app.app_controller import AppController
@@ -80,7 +78,7 @@ class ZoomSelector(QWidget):
 
     def _on_cbb_activated(self, index:int):
         self.cbb.hidePopup()    # force-close popup
-        zi = replace(self.zoom_info, current_index=index, want_to_fit=False)
+        zi = self.zoom_info.replace(current_index=index, want_to_fit=False)
         with block_signals(self.always_fit_btn):
             self.always_fit_btn.setChecked(False)
         self.zoom_change_requested.emit(zi)
@@ -88,7 +86,7 @@ class ZoomSelector(QWidget):
 
 
     def _on_fit_toggle(self, checked:bool):
-        zi = replace(self.zoom_info, want_to_fit=checked)
+        zi = self.zoom_info.replace(want_to_fit=checked)
         self.zoom_change_requested.emit(zi)
     # End def _on_fit_toggle
 # End of class ZoomSelector
@@ -138,8 +136,9 @@ class AnnotatorWidget(QWidget):
     def set_frame(self, frame_id:FrameID|None):
         self.clear_scene()
         if frame_id is not None:
-            pixmap = QPixmap(self.ctl_app.ctl_frames.get_frame_data(frame_id))
-            self.scene = AnnotatorScene(annotations_controller=self.ctl_app.ctl_annotations, instance_controller=self.ctl_app.ctl_instances, frame_id=frame_id, qpixmap=pixmap, parent=self)
+            pixmap = self.ctl_app.ctl_frames.get_frame_pixmap(frame_id)
+            # Same sized frames keep the same fit zoom: render masks at the current view scale right away
+            self.scene = AnnotatorScene(annotations_controller=self.ctl_app.ctl_annotations, instance_controller=self.ctl_app.ctl_instances, frame_id=frame_id, qpixmap=pixmap, view_scale=self.view.view_scale(), parent=self)
             self.view.setScene(self.scene)
     # End of def set_frame
 
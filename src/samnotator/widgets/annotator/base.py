@@ -5,7 +5,7 @@ from typing import Protocol
 # 3RD
 from PySide6.QtCore import QRectF
 # Project
-from samnotator.datamodel import FrameID
+from samnotator.datamodel import FrameID, PointID, PointXY
 from samnotator.controllers.annotations_controller import AnnotationsController
 from samnotator.controllers.instance_controller import InstanceController
 
@@ -25,5 +25,7 @@ class AnnotatorSceneProtocol(Protocol):
     frame_id: FrameID
     annotations_controller: AnnotationsController
     instance_controller: InstanceController
+    scene_bounds: tuple[float, float, float, float] # sceneRect().getCoords(): left, top, right, bottom
 
-    def sceneRect(self) -> QRectF: ...
\ No newline at end of file
+    def sceneRect(self) -> QRectF: ...
+    def point_can_move(self, point_id:PointID, xy:PointXY) -> bool: ...
\ No newline at end of file
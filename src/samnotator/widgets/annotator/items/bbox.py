@@ -1,5 +1,6 @@
 # --- --- --- Imports --- --- ---
 # STD
+from functools import lru_cache
 from typing import cast
 from enum import IntEnum, auto
 # 3RD
@@ -9,7 +10,7 @@ from PySide6.QtWidgets import QGraphicsItem, QGraphicsRectItem, QGraphicsSceneMo
 # Project
 from samnotator.datamodel import InstanceID, Instance, BBox, BBoxID, PointKind, PointXY
 from samnotator.controllers.instance_controller import InstanceInfo
-from ..base import AnnotatorSceneProtocol
+from ..base import AnnotatorSceneProtocol, ZValues
 
 
 # --- --- --- Anchor --- --- ---
@@ -26,20 +27,60 @@ class _HandleAnchor(IntEnum):
 
     def get_rect(self, hs: float) -> QRectF:
         """Return a rect of side "handle size" `hs`, offset so that putting the origin (0,0) of the anchor A at is place on a box B (corner or edge) places A outside of B."""
-        match self:
-            case _HandleAnchor.TopLeft:      return QRectF(-hs, -hs, hs, hs)
-            case _HandleAnchor.TopCenter:    return QRectF(-hs / 2, -hs, hs, hs)
-            case _HandleAnchor.TopRight:     return QRectF(0, -hs, hs, hs)
-            case _HandleAnchor.Right:        return QRectF(0, -hs / 2, hs, hs)
-            case _HandleAnchor.BottomRight:  return QRectF(0, 0, hs, hs)
-            case _HandleAnchor.BottomCenter: return QRectF(-hs / 2, 0, hs, hs)
-            case _HandleAnchor.BottomLeft:   return QRectF(-hs, 0, hs, hs)
-            case _HandleAnchor.Left:         return QRectF(-hs, -hs / 2, hs, hs)
-            case _: return QRectF(0, 0, hs, hs)
+        dx, dy = _ANCHOR_OFFSETS[self - 1]
+        return QRectF(dx * hs, dy * hs, hs, hs)
     # End of def get_rect
 # End of class _HandleAnchor
 
 
+# Handle rect offsets, in units of the handle size, indexed by anchor value - 1 (same order as _HandleAnchor)
+_ANCHOR_OFFSETS: tuple[tuple[float, float], ...] = (
+    (-1.0, -1.0),   # TopLeft
+    (-0.5, -1.0),   # TopCenter
+    ( 0.0, -1.0),   # TopRight
+    ( 0.0, -0.5),   # Right
+    ( 0.0,  0.0),   # BottomRight
+    (-0.5,  0.0),   # BottomCenter
+    (-1.0,  0.0),   # BottomLeft
+    (-1.0, -0.5),   # Left
+)
+
+@lru_cache(maxsize=128)
+def _handle_rect(anchor:_HandleAnchor, hs:int) -> QRectF:
+    """Cached anchor.get_rect(hs): all handles of all boxes share a few sizes. Sharing is safe, setRect copies."""
+    return anchor.get_rect(hs)
+# End of def _handle_rect
+
+
+# Handle positions on the box, as fractions of its (width, height), in _HandleAnchor order
+_ANCHOR_LAYOUT: tuple[tuple[float, float], ...] = (
+    (0.0, 0.0),     # TopLeft
+    (0.5, 0.0),     # TopCenter
+    (1.0, 0.0),     # TopRight
+    (1.0, 0.5),     # Right
+    (1.0, 1.0),     # BottomRight
+    (0.5, 1.0),     # BottomCenter
+    (0.0, 1.0),     # BottomLeft
+    (0.0, 0.5),     # Left
+)
+
+# Edges moved by each anchor, as bit masks over (1 << anchor)
+_LEFT_BITS   = (1 << _HandleAnchor.Left) | (1 << _HandleAnchor.TopLeft) | (1 << _HandleAnchor.BottomLeft)
+_RIGHT_BITS  = (1 << _HandleAnchor.Right) | (1 << _HandleAnchor.TopRight) | (1 << _HandleAnchor.BottomRight)
+_TOP_BITS    = (1 << _HandleAnchor.TopCenter) | (1 << _HandleAnchor.TopLeft) | (1 << _HandleAnchor.TopRight)
+_BOTTOM_BITS = (1 << _HandleAnchor.BottomCenter) | (1 << _HandleAnchor.BottomLeft) | (1 << _HandleAnchor.BottomRight)
+
+
+def _clamp_span(start:int, length:int, lo:int, extent:int, min_length:int) -> tuple[int, int]:
+    """Clamp a 1D span (start, length) inside [lo, lo+extent): length at least min_length but at most extent, then start so the span fits."""
+    length = min_length if length < min_length else length
+    length = extent if length > extent else length
+    hi = lo + extent - length
+    start = lo if start < lo else (hi if start > hi else start)
+    return start, length
+# End of def _clamp_span
+
+
 # --- --- --- Custom Rect Item --- --- ---
 
 class QXItemRect(QGraphicsRectItem):
@@ -51,62 +92,81 @@ class QXItemRect(QGraphicsRectItem):
         self.main_colour = main_colour
         self.contrast_colour = contrast_colour
         self.kind = kind
+        # Painting tools, built once per colour change (see _update_style), indexed by isSelected()
+        self._outline_pens: tuple[tuple[QPen, QPen], tuple[QPen, QPen]] = ((QPen(), QPen()), (QPen(), QPen())) # (contrast, main)
+        self._fill_pens: tuple[QPen, QPen] = (QPen(), QPen())
+        self._brush_fill = QBrush()
+        self._update_style()
+        # No item cache: the cache pixmap is sized from boundingRect (item units), but the cosmetic outline is up to 4 device
+        # pixels wide, whatever the zoom. No item-unit margin covers it at every zoom: the outline would get clipped.
     # End of def __init__
 
 
+    def _update_style(self) -> None:
+        """Rebuild pens and brush from the current colours. Call after changing main_colour/contrast_colour."""
+        def cosmetic_pen(colour:QColor, width:int) -> QPen:
+            pen = QPen(colour)
+            pen.setWidth(width)
+            pen.setCosmetic(True)
+            # Axis-aligned rects: square caps and mitred joins keep the corners of thick edges square
+            pen.setCapStyle(Qt.PenCapStyle.SquareCap)
+            pen.setJoinStyle(Qt.PenJoinStyle.MiterJoin)
+            return pen
+        # Base width: 2 when not selected, 1 when selected.
+        # Outline: the contrast edge (2*base) is thicker than the colour edge (base) drawn over it.
+        self._outline_pens = tuple((cosmetic_pen(self.contrast_colour, 2*bw), cosmetic_pen(self.main_colour, bw)) for bw in (2, 1))
+        self._fill_pens = tuple(cosmetic_pen(self.contrast_colour, bw) for bw in (2, 1))
+        fill_color = QColor(self.main_colour)
+        fill_color.setAlpha(255) # Assume non-positive is the original opacity
+        self._brush_fill = QBrush(fill_color, Qt.BrushStyle.DiagCrossPattern)
+    # End of def _update_style
+
+
+    def set_colors(self, *, main:QColor|None=None, contrast:QColor|None=None) -> None:
+        """Change the colours (rebuilding the painting tools) and schedule a repaint."""
+        if main is not None:
+            self.main_colour = main
+        if contrast is not None:
+            self.contrast_colour = contrast
+        self._update_style()
+        self.update()
+    # End of def set_colors
+
+
     # --- --- --- Custom painting --- --- ---
 
 
     def paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, widget: QWidget | None = None) -> None:
         
         # --- Common Setup ---
-        
-        # 1. Define the contrast pen
-        contrast_pen = QPen(self.contrast_colour)
-        contrast_pen.setCosmetic(True)
-
-        # 2. Define the main color pen
-        main_pen = QPen(self.main_colour)
-        main_pen.setCosmetic(True)
-
-        # 3. Determine base width based on selection
-        base_width = 1 if self.isSelected() else 2
+        rect = self.rect()
+        selected = self.isSelected() # Pens are prebuilt for both selection states
+        # Axis-aligned rects on integer pixels: no antialiasing needed, whatever the view's hints
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing, False)
 
 
         if self.kind == PointKind.POSITIVE:
             # --- POSITIVE KIND: Outline only (Contrast + Color edge) ---
+            contrast_pen, main_pen = self._outline_pens[selected]
             # Draw the first (outer/thicker) edge in contrast color
-            # Width = 2*base_width ensures the contrast edge is thicker than the color edge
-            contrast_pen.setWidth(2 * base_width) 
             painter.setPen(contrast_pen)
             
             # Set brush to NoBrush for no fill
             painter.setBrush(Qt.BrushStyle.NoBrush) 
-            painter.drawRect(self.rect())
+            painter.drawRect(rect)
             
             # Draw the second (inner/thinner) edge in main color
-            main_pen.setWidth(base_width)
             painter.setPen(main_pen)
 
             # Drawing again automatically overlays the previous path
-            painter.drawRect(self.rect())
+            painter.drawRect(rect)
 
         else:
             # --- NON-POSITIVE KIND: Filled (Original Logic) ---
-            
-            # Set the single contrast pen width
-            contrast_pen.setWidth(base_width)
-
-            # Brush style depending on kind
-            fill_color = QColor(self.main_colour)
-            fill_color.setAlpha(255) # Assume non-positive is the original opacity
-            style = Qt.BrushStyle.DiagCrossPattern # From original logic
-            brush = QBrush(fill_color, style)
-
-            # Draw with the single pen and fill
-            painter.setPen(contrast_pen)
-            painter.setBrush(brush)
-            painter.drawRect(self.rect())
+            # Draw with the single contrast pen and fill
+            painter.setPen(self._fill_pens[selected])
+            painter.setBrush(self._brush_fill)
+            painter.drawRect(rect)
             
     # End of def paint
     
@@ -153,7 +213,7 @@ class _QXBoxHandle(QGraphicsRectItem):
         new_handle_size = instance_info.bbox_handle_size
         if new_handle_size is not None and new_handle_size != current_size:
             new_handle_size = max(new_handle_size, self.MIN_HANDLE_SIZE)
-            self.setRect(self.anchor.get_rect(new_handle_size))
+            self.setRect(_handle_rect(self.anchor, new_handle_size))
         else:
             new_handle_size = current_size
         #
@@ -221,8 +281,13 @@ class QXItemBox(QXItemRect):
         self.box_id: BBoxID = box_id
         self.instance_info: InstanceInfo = instance_info
         self.kind: PointKind = kind
-        self._dragging_start_bbox: QRect | None = None
-        self._handles: dict[_HandleAnchor, _QXBoxHandle] = {}
+        self._dragging_start_bbox: tuple[int, int, int, int] | None = None # (left, top, right, bottom) in scene coordinates, inclusive
+        self._dragging_last: tuple[int, int, int, int] | None = None # Last (left, top, right, bottom) reached during a handle drag
+        self._dragging_preview: QXItemRect | None = None # Shows the resized box during a handle drag; the box is only resized on release
+        self._move_bounds: tuple[float, float, float, float] | None = None # (min_x, min_y, max_x, max_y) for pos(), valid for the current size
+        self._handles: list[_QXBoxHandle] = [] # In _HandleAnchor order; created on first selection, see _set_handles_visible
+        self._handles_visible: bool = False
+        self._handles_dirty: bool = False # Box resized while the handles were hidden: reposition them when shown
 
         # Behaviour flags
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsSelectable, True)
@@ -231,16 +296,11 @@ class QXItemBox(QXItemRect):
 
         # Init
         self.setPos(bbox.topLeft())
-        self._create_handles()
-        self._update_handles_positions()
-        self._set_handles_visible(False)
     # End of def __init__
 
 
     def _create_handles(self) -> None:
-        for role in _HandleAnchor:
-            handle = _QXBoxHandle(role, self)
-            self._handles[role] = handle
+        self._handles = [_QXBoxHandle(role, self) for role in _HandleAnchor]
     # End of def _create_handles
 
     
@@ -251,16 +311,19 @@ class QXItemBox(QXItemRect):
         if rect_scene_coordinate is not None:
             self._updated_bbox(rect_scene_coordinate)
 
-        # Kind
-        if kind is not None:
+        # Kind and instance info only change the painting: a single repaint for both, no geometry change
+        needs_repaint = False
+        if kind is not None and kind != self.kind:
             self.kind = kind
-            self.update()
+            needs_repaint = True
 
-        # Instance info
         if instance_info is not None:
             self.instance_info = instance_info
-            self.main_colour = instance_info.main_colour
-            self.contrast_colour = instance_info.contrast_colour
+            if instance_info.main_colour != self.main_colour or instance_info.contrast_colour != self.contrast_colour:
+                self.set_colors(main=instance_info.main_colour, contrast=instance_info.contrast_colour)
+        #
+
+        if needs_repaint:
             self.update()
     # End of def set
 
@@ -268,8 +331,15 @@ class QXItemBox(QXItemRect):
     # --- -- ---- Private helpers --- --- ---
 
     def _set_handles_visible(self, visible: bool) -> None:
+        # Most boxes are never selected: only pay for the 8 handle items once a box is
+        if visible and (not self._handles or self._handles_dirty):
+            if not self._handles:
+                self._create_handles()
+            self._update_handles_positions()
+            self._handles_dirty = False
+        self._handles_visible = visible
         zvalue = self.zValue() + 1 # Always on top of the box
-        for h in self._handles.values():
+        for h in self._handles:
             h.setVisible(visible)
             h.setZValue(zvalue)
     # End of def _set_handles_visible
@@ -279,65 +349,48 @@ class QXItemBox(QXItemRect):
         """Update local rect/pos from a bbox in scene coordinates and update handles."""
         # Always work with a normalised rect as the original geometry
         original = bbox.normalized()
-        scene_rect = self.scene().sceneRect().toRect()
-        # Scene geometry
-        scene_left = scene_rect.left()
-        scene_top = scene_rect.top()
-        scene_w = scene_rect.width()
-        scene_h = scene_rect.height()
-        # Desired sizes: respect MIN_* but never exceed scene size
-        desired_w = max(original.width(), self.MIN_SIZE)
-        desired_h = max(original.height(), self.MIN_SIZE)
-        # Target sizes clamped to scene size
-        width = min(desired_w, scene_w)
-        height = min(desired_h, scene_h)
-
-        # Clamp top-left so that the box stays inside the scene with target width/height (clamped to scene size)
-        min_left = scene_left
-        max_left = scene_left + scene_w - width  # == scene_right - width
-        if max_left < min_left:
-            left = scene_left
-        else:
-            left = min(max(original.left(), min_left), max_left)
-
-        min_top = scene_top
-        max_top = scene_top + scene_h - height
-        if max_top < min_top:
-            top = scene_top
-        else:
-            top = min(max(original.top(), min_top), max_top)
+        self._updated_bbox_raw(original.left(), original.top(), original.width(), original.height())
+    # End of def _updated_bbox
 
-        # Apply: pos = top-left, local rect = (0,0,w,h)
-        self.setPos(left, top)
-        self.setRect(QRect(0, 0, width, height))
 
-        # Update handle anchors
-        self._update_handles_positions()
-    # End of def _updated_bbox
+    def _clamp_to_scene(self, left:int, top:int, width:int, height:int) -> tuple[int, int, int, int]:
+        """Clamp a normalised (left, top, width, height) in scene coordinates so that the box fits in the scene."""
+        # Scene geometry, from the bounds the scene computed once (sceneRect is the frame pixmap rect: integral)
+        x0, y0, x1, y1 = cast(AnnotatorSceneProtocol, self.scene()).scene_bounds
+        # Sizes respect MIN_SIZE but never exceed the scene size; top-left is clamped so that the box stays inside the scene
+        left, width = _clamp_span(left, width, int(x0), int(x1 - x0), self.MIN_SIZE)
+        top, height = _clamp_span(top, height, int(y0), int(y1 - y0), self.MIN_SIZE)
+        return left, top, width, height
+    # End of def _clamp_to_scene
+
+
+    def _updated_bbox_raw(self, left:int, top:int, width:int, height:int) -> None:
+        """Same as _updated_bbox, from a normalised (left, top, width, height) in scene coordinates."""
+        left, top, width, height = self._clamp_to_scene(left, top, width, height)
+
+        # Apply: local rect = (0,0,w,h), pos = top-left
+        # Only touch what changed: a pure move keeps the local rect, hence the handles (children) stay in place
+        # Size first: the position clamp in itemChange must use the new size
+        r = self.rect()
+        if r.width() != width or r.height() != height:
+            self.setRect(0, 0, width, height)
+            self._move_bounds = None
+            if self._handles_visible:
+                self._update_handles_positions()
+            else:
+                self._handles_dirty = True
+        p = self.pos()
+        if p.x() != left or p.y() != top:
+            self.setPos(left, top)
+    # End of def _updated_bbox_raw
 
 
     def _update_handles_positions(self) -> None:
         """Position handles around the box, fully outside."""
-        r: QRectF = self.rect()
-        xleft, ytop = r.left(), r.top()
-        xright, ybottom = r.right(), r.bottom()
-        xcenter = (xleft + xright) * 0.5
-        ycenter = (ytop + ybottom) * 0.5
-
+        x0, y0, w, h = self.rect().getRect()
         # Anchors are in local (box) coordinates
-        anchors: dict[_HandleAnchor, QPointF] = {
-            _HandleAnchor.TopLeft: QPointF(xleft, ytop),
-            _HandleAnchor.TopCenter: QPointF(xcenter, ytop),
-            _HandleAnchor.TopRight: QPointF(xright, ytop),
-            _HandleAnchor.Right: QPointF(xright, ycenter),
-            _HandleAnchor.BottomRight: QPointF(xright, ybottom),
-            _HandleAnchor.BottomCenter: QPointF(xcenter, ybottom),
-            _HandleAnchor.BottomLeft: QPointF(xleft, ybottom),
-            _HandleAnchor.Left: QPointF(xleft, ycenter),
-        }
-
-        for role, handle in self._handles.items():
-            handle.setPos(anchors[role])
+        for (fx, fy), handle in zip(_ANCHOR_LAYOUT, self._handles):
+            handle.setPos(x0 + fx*w, y0 + fy*h)
     # End of def _update_handles_positions
 
 
@@ -354,25 +407,26 @@ class QXItemBox(QXItemRect):
     # --- --- --- Selection / item changes --- --- ---
 
     def itemChange(self, change: QGraphicsItem.GraphicsItemChange, value):
-        scene = cast(AnnotatorSceneProtocol, self.scene())
-
         # 1) Handle selection
         if change == QGraphicsItem.GraphicsItemChange.ItemSelectedHasChanged:
             selected = bool(value)
             self._set_handles_visible(selected)
+            scene = cast(AnnotatorSceneProtocol, self.scene())
             scene.instance_controller.set_current_instance(self.instance_info.instance.instance_id)
 
         # 2) Position changed: clamp movement to sceneRect
         elif change == QGraphicsItem.GraphicsItemChange.ItemPositionChange:
-            scene_rect = scene.sceneRect()
+            # Bounds only depend on the scene and the box size: computed once per size
+            if (bounds := self._move_bounds) is None:
+                min_x, min_y, scene_right, scene_bottom = cast(AnnotatorSceneProtocol, self.scene()).scene_bounds
+                r = self.rect()
+                # clamp so the whole box stays inside scene rect
+                bounds = self._move_bounds = (min_x, min_y, scene_right - r.width(), scene_bottom - r.height())
+            min_x, min_y, max_x, max_y = bounds
             new_pos = cast(QPointF, value)
-            # clamp so the whole box stays inside scene rect
-            min_x = scene_rect.left()
-            min_y = scene_rect.top()
-            max_x = scene_rect.right() - self.rect().width()
-            max_y = scene_rect.bottom() - self.rect().height()
-            clamped_x = min(max(new_pos.x(), min_x), max_x)
-            clamped_y = min(max(new_pos.y(), min_y), max_y)
+            x, y = new_pos.x(), new_pos.y()
+            clamped_x = min_x if x < min_x else (max_x if x > max_x else x)
+            clamped_y = min_y if y < min_y else (max_y if y > max_y else y)
             return QPointF(clamped_x, clamped_y)
 
         return super().itemChange(change, value)
@@ -384,7 +438,14 @@ class QXItemBox(QXItemRect):
     def begin_handle_drag(self) -> None:
         """Called by handles on mouse press."""
         # Store starting bbox in scene coordinates
-        self._dragging_start_bbox = self.mapRectToScene(self.rect()).toRect()
+        r0 = self.mapRectToScene(self.rect()).toRect()
+        self._dragging_start_bbox = (r0.left(), r0.top(), r0.right(), r0.bottom())
+        self._dragging_last = None
+        # Preview of the resized box, drawn above everything; created here so that it matches the current look
+        preview = self._dragging_preview = QXItemRect(QRectF(r0), main_colour=self.main_colour, contrast_colour=self.contrast_colour, kind=self.kind)
+        preview.setZValue(ZValues.DRAG_BOX_PREVIEW)
+        preview.setAcceptedMouseButtons(Qt.MouseButton.NoButton)
+        self.scene().addItem(preview)
     # End of def begin_handle_drag
 
 
@@ -395,9 +456,7 @@ class QXItemBox(QXItemRect):
 
         # Starting rectangle remains the reference during the drag
         # Do not update it until drag ends/do not use self.rect() during drag (it would accumulate changes instead)
-        r0 = self._dragging_start_bbox
-        left0, right0 = r0.left(), r0.right()
-        top0, bottom0 = r0.top(), r0.bottom()
+        left0, top0, right0, bottom0 = self._dragging_start_bbox
 
         # Current anchor position in scene coords: delta to starting rect
         x = int(anchor_scene.x())
@@ -406,29 +465,39 @@ class QXItemBox(QXItemRect):
         # Init value = pre drag rect, then adjust according to handle role and anchor scene position
         left, right = left0, right0
         top, bottom = top0, bottom0
+        min_size = self.MIN_SIZE
 
         # X axis: anchor on left or right edge
         # Don't let left/right edges cross each other: clamp to opposite edges adjusted by +- MIN_SIZE
-        if role in (_HandleAnchor.Left, _HandleAnchor.TopLeft, _HandleAnchor.BottomLeft):
-            right_fixed = right0 - self.MIN_SIZE
+        role_bit = 1 << role
+        if role_bit & _LEFT_BITS:
+            right_fixed = right0 - min_size
             left = min(x, right_fixed)
-        if role in (_HandleAnchor.Right, _HandleAnchor.TopRight, _HandleAnchor.BottomRight):
-            left_fixed = left0 + self.MIN_SIZE
+        if role_bit & _RIGHT_BITS:
+            left_fixed = left0 + min_size
             right = max(x, left_fixed)
         #
 
         # Y axis: anchor on top or bottom edge
         # Don't let top/bottom edges cross each other: clamp to opposite edges adjusted by +- MIN_SIZE
-        if role in (_HandleAnchor.TopCenter, _HandleAnchor.TopLeft, _HandleAnchor.TopRight):
-            bottom_fixed = bottom0 - self.MIN_SIZE
+        if role_bit & _TOP_BITS:
+            bottom_fixed = bottom0 - min_size
             top = min(y, bottom_fixed)
-        if role in (_HandleAnchor.BottomCenter, _HandleAnchor.BottomLeft, _HandleAnchor.BottomRight):
-            top_fixed = top0 + self.MIN_SIZE
+        if role_bit & _BOTTOM_BITS:
+            top_fixed = top0 + min_size
             bottom = max(y, top_fixed)
         #
 
-        new_scene_rect = QRect(QPoint(left, top), QPoint(right, bottom))
-        self._updated_bbox(new_scene_rect)
+        # Mouse moves within the same pixel (or past a clamp) give the same box: nothing to apply
+        edges = (left, top, right, bottom)
+        if edges == self._dragging_last:
+            return
+        self._dragging_last = edges
+
+        # Only move the preview: the box itself (and its handles) is resized once, in end_handle_drag
+        # Edges cannot cross (MIN_SIZE clamps above): already normalised. Inclusive corners, as QRect(QPoint, QPoint)
+        if self._dragging_preview is not None:
+            self._dragging_preview.setRect(*self._clamp_to_scene(left, top, right - left + 1, bottom - top + 1))
     # End of def on_handle_dragged
 
 
@@ -436,7 +505,16 @@ class QXItemBox(QXItemRect):
         """Called by handles on release. Commit final rect to controller."""
         if self._dragging_start_bbox is None:
             return
+        # Apply the previewed geometry, then drop the preview
+        if (edges := self._dragging_last) is not None:
+            left, top, right, bottom = edges
+            self._updated_bbox_raw(left, top, right - left + 1, bottom - top + 1)
+        if (preview := self._dragging_preview) is not None:
+            if (scene := preview.scene()) is not None:
+                scene.removeItem(preview)
+            self._dragging_preview = None
         self._dragging_start_bbox = None
+        self._dragging_last = None
         self._commit_rect_change()
     # End of def end_handle_drag
 
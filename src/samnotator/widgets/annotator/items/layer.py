@@ -44,7 +44,8 @@ class Layer:
     #
     point_items:dict[PointID, QXItemPoint]
     bbox_items:dict[int, QXItemBox]
-    markers:list[QPixmap]
+    point_marks:tuple[QPixmap, ...]     # Current marks of the instance, indexed by PointKind
+    markers_version:int     # InstanceInfo.marks_version applied to the point items, -1 if none
     mask:QGraphicsPixmapItem|None
     #
 
@@ -61,7 +62,7 @@ class Layer:
         lm = LayerItem(instance_id)
         lm.setZValue(ZValues.MASK)
         #
-        return cls(instance_id = instance_id, layer_points = lp, layer_bbox = lb, layer_mask = lm, point_items = {}, bbox_items = {}, markers = [], mask = None)
+        return cls(instance_id = instance_id, layer_points = lp, layer_bbox = lb, layer_mask = lm, point_items = {}, bbox_items = {}, point_marks = (), markers_version = -1, mask = None)
     # End of classmethod def default
 #
 
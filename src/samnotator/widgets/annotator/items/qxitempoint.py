@@ -2,7 +2,7 @@
 # STD
 from typing import cast
 # 3RD
-from PySide6.QtCore import Qt, QRectF, QPointF
+from PySide6.QtCore import Qt, QPointF
 from PySide6.QtGui import QPixmap
 from PySide6.QtWidgets import QGraphicsPixmapItem, QGraphicsItem, QGraphicsSceneMouseEvent
 # Project
@@ -11,20 +11,36 @@ from samnotator.datamodel import PointKind, PointID, PointXY
 from ..base import AnnotatorSceneProtocol
 
 
+def _clamp_snap(nx:float, ny:float, left:float, top:float, right:float, bottom:float) -> tuple[int, int]:
+    """Clamp a position inside [left, right]x[top, bottom] and snap it to its pixel. Return the pixel coordinates."""
+    x = left if nx < left else (right if nx > right else nx)
+    y = top if ny < top else (bottom if ny > bottom else ny)
+    return int(x), int(y)
+# End of def _clamp_snap
+
+
+# Point items flags, combined once (QGraphicsPixmapItem has no default flags to keep)
+_POINT_FLAGS = (QGraphicsItem.GraphicsItemFlag.ItemIgnoresTransformations
+                | QGraphicsItem.GraphicsItemFlag.ItemIsSelectable
+                | QGraphicsItem.GraphicsItemFlag.ItemIsMovable
+                | QGraphicsItem.GraphicsItemFlag.ItemSendsGeometryChanges)
+
+
+
 class QXItemPoint(QGraphicsPixmapItem):
 
     def __init__(self, pid:PointID, kind:PointKind, iid:InstanceID, pixmap:QPixmap, position:PointXY, parent:QGraphicsItem|None=None) -> None:
         super().__init__(pixmap, parent)
         self.point_id = pid
         self.instance_id = iid
+        # Last (x, y) resolved by the collision check during a drag, and its outcome
+        self._last_xy:tuple[int, int] = (-1, -1)
+        self._last_can_move:bool = False
 
-        self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIgnoresTransformations, True)
-        self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsSelectable, True)
-        self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsMovable, True)
-        self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemSendsGeometryChanges, True)
+        self.setFlags(_POINT_FLAGS)
 
-        # If we have perf issue... we should not with the amount of mark/scene
-        #self.setShapeMode(QGraphicsPixmapItem.ShapeMode.BoundingRectShape)
+        # Hit test on the mark's square, not on its alpha mask (marks are small discs: the corners are negligible)
+        self.setShapeMode(QGraphicsPixmapItem.ShapeMode.BoundingRectShape)
 
         self.set(pixmap, kind, position)
     # End of def __init__
@@ -33,15 +49,19 @@ class QXItemPoint(QGraphicsPixmapItem):
     def set(self, pixmap:QPixmap|None, kind:PointKind|None=None, point_xy:PointXY|None=None) -> None:
         if pixmap is not None:
             self.setPixmap(pixmap)
+            # The offset only depends on the pixmap: centre it on pos(), computed from the given pixmap (no self.pixmap() copy)
+            center = pixmap.rect().center()
+            self.setOffset(-center.x(), -center.y())
 
         if kind is not None:
             self.point_kind = kind
 
         if point_xy is not None:
-            center = self.pixmap().rect().center()
             x,y = point_xy
-            self.setPos(x+0.5, y+0.5)
-            self.setOffset(-center.x(), -center.y())
+            # Skip no-op moves: avoid a geometry change (and index update) when only the kind/pixmap changed
+            new_pos = QPointF(x+0.5, y+0.5)
+            if self.pos() != new_pos:
+                self.setPos(new_pos)
     # End of def set
 
 
@@ -55,14 +75,20 @@ class QXItemPoint(QGraphicsPixmapItem):
         # 2) Position change: clamp to scene rect and check for collisions
         elif change == QGraphicsItem.GraphicsItemChange.ItemPositionChange and scene is not None:
             new_pos = cast(QPointF, value)
-            scene_rect: QRectF = scene.sceneRect()
 
             # 1) Clamp to scene rect (keep center inside) and centre on pixel
-            x = int(max(scene_rect.left(),  min(new_pos.x(), scene_rect.right())))
-            y = int(max(scene_rect.top(),   min(new_pos.y(), scene_rect.bottom())))
+            x, y = _clamp_snap(new_pos.x(), new_pos.y(), *scene.scene_bounds)
+
+            # 2) Staying on our own pixel is always allowed: no collision check
+            cur = self.pos()
+            if int(cur.x()) == x and int(cur.y()) == y:
+                return QPointF(x+0.5, y+0.5)
 
-            # 2) Collision check
-            if scene.annotations_controller.point_can_move(point_id=self.point_id, frame_id=scene.frame_id, xy=PointXY((x, y))):
+            # 3) Collision check, only when the target pixel changed: sub-pixel moves resolve to the same (x, y)
+            if (x, y) != self._last_xy:
+                self._last_xy = (x, y)
+                self._last_can_move = scene.point_can_move(self.point_id, PointXY((x, y)))
+            if self._last_can_move:
                 return QPointF(x+0.5, y+0.5)
             else: # Position is already occupied: reject the move, stay where we are
                 return self.pos()
@@ -73,6 +99,8 @@ class QXItemPoint(QGraphicsPixmapItem):
 
     def mouseReleaseEvent(self, event: QGraphicsSceneMouseEvent) -> None:
         super().mouseReleaseEvent(event)
+        # Occupancy may change before the next drag: forget the cached collision result
+        self._last_xy = (-1, -1)
 
         # Check for left button release
         if event.button() == Qt.MouseButton.LeftButton:
@@ -2,58 +2,75 @@
 # --- --- --- Imports --- --- ---
 # STD
 from bisect import bisect_left
-from dataclasses import dataclass, replace
 # 3RD
 from PySide6.QtCore import QObject, SignalInstance
 from PySide6.QtWidgets import QGraphicsView
 
 # --- --- --- Constants --- --- ---
 # Zoom level in %
-_ZOOM_LEVELS:list[int] = [5, 10, 15, 20, 25, 30, 40, 50, 60, 75, 80, 85, 90, 95, 100, 110, 125, 133, 150, 200, 300, 400, 600, 800, 1000, 1200, 1600, 3200, 6400, 12800, 25600, 51200, 102400, 128000]
+_ZOOM_LEVELS:tuple[int, ...] = (5, 10, 15, 20, 25, 30, 40, 50, 60, 75, 80, 85, 90, 95, 100, 110, 125, 133, 150, 200, 300, 400, 600, 800, 1000, 1200, 1600, 3200, 6400, 12800, 25600, 51200, 102400, 128000)
 _MIN_ZOOM_LEVEL:int = _ZOOM_LEVELS[0]
 _MAX_ZOOM_LEVEL:int = _ZOOM_LEVELS[-1]
 _DEFAULT_LEVEL:int = 100
 
 
-# --- --- --- Dataclass ZoomInfo --- --- ---
+# --- --- --- ZoomInfo --- --- ---
 
-@dataclass(frozen=True, slots=True)
 class ZoomInfo:
-    zoom_levels:list[int]
-    current_index:int
-    fit_index:int
-    want_to_fit:bool
-
-    @property
-    def current_level(self)->int:
-        return self.zoom_levels[self.current_index]
-    #
-
-    @property
-    def fit_level(self)->int:
-        return self.zoom_levels[self.fit_index]
-    #
-
-    @property
-    def is_fit(self)->bool:
-        return self.current_index == self.fit_index
-    #
-
-    @property
-    def wanted_index(self)->int:
-        if self.want_to_fit: return self.fit_index
-        else: return self.current_index
-    #
+    """
+    Immutable zoom state: levels, current and fit indexes, and whether we want to fit.
+    Built on every zoom step: a plain slotted class with a single pass __init__, rather than a frozen dataclass
+    (whose __init__ goes through object.__setattr__ for every field). Treat instances as read-only.
+    """
+    __slots__ = ("zoom_levels", "current_index", "fit_index", "want_to_fit", "current_level", "fit_level", "is_fit", "wanted_index", "wanted_level")
+
+    def __init__(self, zoom_levels:tuple[int, ...], current_index:int, fit_index:int, want_to_fit:bool) -> None:
+        self.zoom_levels:tuple[int, ...] = zoom_levels   # Immutable: may be shared between infos (and with _ZOOM_LEVELS)
+        self.current_index:int = current_index
+        self.fit_index:int = fit_index
+        self.want_to_fit:bool = want_to_fit
+        # Derived values, computed once here: plain slot reads instead of properties
+        wanted_index = fit_index if want_to_fit else current_index
+        self.current_level:int = zoom_levels[current_index]
+        self.fit_level:int = zoom_levels[fit_index]
+        self.is_fit:bool = current_index == fit_index
+        self.wanted_index:int = wanted_index
+        self.wanted_level:int = zoom_levels[wanted_index]
+    # End of def __init__
 
-    @property
-    def wanted_level(self)->int:
-        return self.zoom_levels[self.wanted_index]
-    #
+    def __eq__(self, other:object) -> bool:
+        if not isinstance(other, ZoomInfo):
+            return NotImplemented
+        # Levels are usually shared (see ViewZoomState._levels_with_fit): identity first, element-wise only if needed
+        return (self.current_index == other.current_index and self.fit_index == other.fit_index and self.want_to_fit == other.want_to_fit
+                and (self.zoom_levels is other.zoom_levels or self.zoom_levels == other.zoom_levels))
+    # End of def __eq__
+
+    def __hash__(self) -> int:
+        return hash((self.zoom_levels, self.current_index, self.fit_index, self.want_to_fit))
+    # End of def __hash__
+
+    def __repr__(self) -> str:
+        return f"ZoomInfo(current_level={self.current_level}, fit_level={self.fit_level}, want_to_fit={self.want_to_fit})"
+    # End of def __repr__
+
+    def replace(self, *, current_index:int|None=None, fit_index:int|None=None, want_to_fit:bool|None=None) -> "ZoomInfo":
+        """Return a copy with the given fields changed (same levels)."""
+        return ZoomInfo(
+            self.zoom_levels,
+            self.current_index if current_index is None else current_index,
+            self.fit_index if fit_index is None else fit_index,
+            self.want_to_fit if want_to_fit is None else want_to_fit,
+        )
+    # End of def replace
 
     @classmethod
     def default(cls)->"ZoomInfo":
-        return cls(zoom_levels=[_DEFAULT_LEVEL], current_index=0, fit_index=0, want_to_fit=False)
-# End of dataclass ZoomInfo
+        return _DEFAULT_ZOOM_INFO
+# End of class ZoomInfo
+
+# Frozen: a single shared instance
+_DEFAULT_ZOOM_INFO:ZoomInfo = ZoomInfo(zoom_levels=(_DEFAULT_LEVEL,), current_index=0, fit_index=0, want_to_fit=False)
 
 
 class ViewZoomState(QObject):
@@ -72,40 +89,62 @@ class ViewZoomState(QObject):
         super().__init__(parent)
         self.zoom_changed = zoom_changed
         self._info:ZoomInfo = ZoomInfo.default()
+        # Last _levels_with_fit result, as (fit_level, zoom_levels, fit_index): resizes keep asking for the same fit level
+        self._last_levels:tuple[int, tuple[int, ...], int]|None = None
+        # Last _level_to_index lookup, as (zoom_levels, level, index): keeps the levels object alive so that `is` is a safe key
+        self._last_l2i:tuple[tuple[int, ...], int, int]|None = None
     # End of def __init__
 
 
-    @classmethod
-    def _levels_with_fit(cls, fit_level:int)->tuple[list[int], int]:
-        """Return the list of zoom levels including the 'fit level', with its index."""
-        zooms = _ZOOM_LEVELS.copy()
-        fit_idx = bisect_left(zooms, fit_level)
-        # Insert fit level if not present
-        if fit_idx == len(zooms) or zooms[fit_idx] != fit_level:
-            zooms.insert(fit_idx, fit_level)
+    def _levels_with_fit(self, fit_level:int)->tuple[tuple[int, ...], int]:
+        """Return the zoom levels including the 'fit level', with its index."""
+        if (last := self._last_levels) is not None and last[0] == fit_level:
+            return last[1], last[2]
+        fit_idx = bisect_left(_ZOOM_LEVELS, fit_level)
+        # Insert fit level if not present, else share the constant levels
+        if fit_idx < len(_ZOOM_LEVELS) and _ZOOM_LEVELS[fit_idx] == fit_level:
+            zooms = _ZOOM_LEVELS
+        else:
+            zooms = _ZOOM_LEVELS[:fit_idx] + (fit_level,) + _ZOOM_LEVELS[fit_idx:]
+        self._last_levels = (fit_level, zooms, fit_idx)
         return zooms, fit_idx
     #
 
 
     # --- --- --- Private Helpers --- --- ---
     
-    def _level_to_index(self, level:int, zoom_levels:list[int]) -> int:
+    def _level_to_index(self, level:int, zoom_levels:tuple[int, ...]) -> int:
         "Find the index of level (or closest towards 0), capped to bounds, in zoom_levels"
         if level < _MIN_ZOOM_LEVEL: return 0
         if level > _MAX_ZOOM_LEVEL: return len(zoom_levels) - 1
-        return bisect_left(zoom_levels, level)
+        if (last := self._last_l2i) is not None and last[0] is zoom_levels and last[1] == level:
+            return last[2]
+        index = bisect_left(zoom_levels, level)
+        self._last_l2i = (zoom_levels, level, index)
+        return index
     # End of def level_to_index
 
 
     def _info_for_index(self, target_index:int)->ZoomInfo:
-        """Compute ZoomInfo for the given target index. DOES NOT EMIT."""
-        target_index = max(0, min(target_index, len(self._info.zoom_levels) - 1))
-        if target_index != self._info.current_index:
-            self._info = replace(self._info, current_index=target_index, want_to_fit=False)
+        """Compute ZoomInfo for the given target index. DOES NOT EMIT, and does not change the current info (see set)."""
+        info = self._info
+        target_index = max(0, min(target_index, len(info.zoom_levels) - 1))
+        if target_index != info.current_index:
+            return ZoomInfo(zoom_levels=info.zoom_levels, current_index=target_index, fit_index=info.fit_index, want_to_fit=False)
         #
-        return self._info
+        return info
     # End of def _set_index
 
+
+    def _update(self, info:ZoomInfo)->ZoomInfo:
+        """Make info the current info, firing zoom_changed only if it differs from the previous one."""
+        old_info = self._info
+        if info is not old_info and info != old_info:
+            self._info = info
+            self.zoom_changed.emit(info)
+        return self._info
+    # End of def _update
+
     
     # --- --- --- Public Core Methods --- --- ---
 
@@ -115,44 +154,44 @@ class ViewZoomState(QObject):
     
     
     def set(self, info: ZoomInfo) -> ZoomInfo:
-        self._info = info
-        self.zoom_changed.emit(self._info)
-        return self._info
+        """Set the zoom info. Fires zoom_changed on change."""
+        return self._update(info)
     #
 
 
     def set_current_level(self, target_level:int)->ZoomInfo:
         """ Set the zoom to the given level if possible, or select the closest one towards 0. Fires only on change, if init (called reset before)"""
-        if target_level != self._info.current_level:
-            target_index = self._level_to_index(target_level, self._info.zoom_levels)
-            if target_index != self._info.current_index:
-                self._info = replace(self._info, current_index=target_index, want_to_fit=False)
-                self.zoom_changed.emit(self._info)
+        info = self._info
+        if target_level != info.current_level:
+            # bisect_left gives back the current index iff levels[current - 1] < target_level <= levels[current]: no change
+            levels, current_index = info.zoom_levels, info.current_index
+            if target_level < info.current_level and (current_index == 0 or levels[current_index - 1] < target_level):
+                return info
+            target_index = self._level_to_index(target_level, levels)
+            if target_index != current_index:
+                self._update(ZoomInfo(zoom_levels=info.zoom_levels, current_index=target_index, fit_index=info.fit_index, want_to_fit=False))
         #
         return self._info
     #
     
     
     def set_fit_level(self, fit_level:int)->ZoomInfo:
-        """ Set a new fit level, adjusting the zoom levels list accordingly. Fires zoom_changed signal."""
+        """ Set a new fit level, adjusting the zoom levels list accordingly. Fires zoom_changed signal on change."""
         zoom_levels, fit_index = self._levels_with_fit(fit_level)
+        info = self._info
         #
-        if self._info.want_to_fit: target_index = fit_index
-        else: target_index = self._level_to_index(self._info.current_level, zoom_levels)
+        if info.want_to_fit: target_index = fit_index
+        else: target_index = self._level_to_index(info.current_level, zoom_levels)
         #
-        self._info = replace(self._info, zoom_levels=zoom_levels, current_index=target_index, fit_index=fit_index)
-        self.zoom_changed.emit(self._info)
-        return self._info
+        return self._update(ZoomInfo(zoom_levels=zoom_levels, current_index=target_index, fit_index=fit_index, want_to_fit=info.want_to_fit))
     #
 
 
     def set_want_to_fit(self, want_to_fit:bool)->ZoomInfo:
-        """ Set whether to want to fit or not."""
-        if want_to_fit:
-            target_index = self._info.fit_index
-        self._info = replace(self._info, current_index=target_index, want_to_fit=want_to_fit)
-        self.zoom_changed.emit(self._info)
-        return self._info
+        """ Set whether to want to fit or not. Fires zoom_changed signal on change."""
+        info = self._info
+        target_index = info.fit_index if want_to_fit else info.current_index
+        return self._update(ZoomInfo(zoom_levels=info.zoom_levels, current_index=target_index, fit_index=info.fit_index, want_to_fit=want_to_fit))
     #
 
     
@@ -2,11 +2,11 @@
 # STD
 from typing import Any
 # 3RD
-from PySide6.QtCore import Qt, QEvent, QAbstractItemModel, QModelIndex, QObject, QPersistentModelIndex, QPoint, QRect, QSize, Slot
+from PySide6.QtCore import Qt, QEvent, QAbstractItemModel, QModelIndex, QObject, QPersistentModelIndex, QPoint, QRect, QSize, QTimer, Slot
 from PySide6.QtGui import QColor, QIcon, QPainter
 from PySide6.QtWidgets import QComboBox, QCompleter, QColorDialog, QHBoxLayout, QToolButton, QStyledItemDelegate, QStyleOptionViewItem, QWidget, QAbstractItemView
 # Project
-from .instance_table_model import ROLE_MARK_VISIBLE, ROLE_MASK_VISIBLE
+from .instance_table_model import ROLE_MARK_VISIBLE, ROLE_MASK_VISIBLE, ROLE_VISIBILITY_BULK
 from samnotator.utils_qt.contextblock import block_signals, save_painter
 from samnotator.controllers.instance_controller import InstanceController
 
@@ -22,6 +22,9 @@ class _VisibilityEditor(QWidget):
     def __init__(self, parent: QWidget | None = None) -> None:
         super().__init__(parent)
         self._index: QPersistentModelIndex | None = None
+        # Toggles waiting to be written: coalesced into one setData at the next event loop iteration
+        self._pending: dict[int, bool] = {}
+        self._flush_scheduled = False
         self.mark_btn = self._mk_button("X", self._on_mark_clicked, None)
         self.mask_btn = self._mk_button("M", self._on_mask_clicked, None)
         layout = QHBoxLayout(self)
@@ -46,33 +49,61 @@ class _VisibilityEditor(QWidget):
 
     def set_index(self, index: QPersistentModelIndex | None) -> None:
         """Bind this editor to a model index and sync button states from the model."""
+        if self._pending and (index is None or index != self._index):
+            self._flush() # Pending toggles belong to the previous index
         self._index = index
-        # Sync from model
+        self.sync_from_model()
+    # End of def set_index
+
+
+    def is_bound_to(self, index: QModelIndex) -> bool:
+        """True if this editor is already bound to (a valid persistent copy of) index."""
+        return (bound := self._index) is not None and bound.isValid() and bound.row() == index.row() \
+            and bound.column() == index.column() and bound.model() is index.model()
+    # End of def is_bound_to
+
+
+    def sync_from_model(self) -> None:
+        """Sync button states from the model."""
         if (index := self._index) is not None and index.isValid():
             model: QAbstractItemModel = index.model()
             with block_signals(self.mark_btn, self.mask_btn):
                 self.mark_btn.setChecked(bool(model.data(index, ROLE_MARK_VISIBLE)))
                 self.mask_btn.setChecked(bool(model.data(index, ROLE_MASK_VISIBLE)))
-    # End of def set_index
+    # End of def sync_from_model
 
 
     # --- --- --- Button handlers --- --- ---
 
     def _on_mark_clicked(self) -> None:
         """Toggle mark/bbox visibility via the model."""
-        if (index := self._index) is not None and index.isValid():
-            model = index.model()
-            current = bool(model.data(index, ROLE_MARK_VISIBLE))
-            model.setData(index, not current, ROLE_MARK_VISIBLE)
+        self._toggle(ROLE_MARK_VISIBLE)
     # End of def _on_mark_clicked
 
     def _on_mask_clicked(self) -> None:
         """Toggle mask visibility via the model."""
-        if (index := self._index) is not None and index.isValid():
-            model =  index.model()
-            current = bool(model.data(index, ROLE_MASK_VISIBLE))
-            model.setData(index, not current, ROLE_MASK_VISIBLE)
+        self._toggle(ROLE_MASK_VISIBLE)
     # End of def _on_mask_clicked
+
+    def _toggle(self, role: int) -> None:
+        """Queue the toggle of a visibility role; toggles made in the same event loop iteration are written together."""
+        if (index := self._index) is not None and index.isValid():
+            current = self._pending.get(role)
+            if current is None:
+                current = bool(index.model().data(index, role))
+            self._pending[role] = not current
+            if not self._flush_scheduled:
+                self._flush_scheduled = True
+                QTimer.singleShot(0, self._flush)
+    # End of def _toggle
+
+    def _flush(self) -> None:
+        """Write all pending toggles with a single setData."""
+        self._flush_scheduled = False
+        pending, self._pending = self._pending, {}
+        if pending and (index := self._index) is not None and index.isValid():
+            index.model().setData(index, pending, ROLE_VISIBILITY_BULK)
+    # End of def _flush
 # End of class _VisibilityEditor
 
 
@@ -98,7 +129,11 @@ class VisibilityDelegate(QStyledItemDelegate):
         """Sync the editor from the model when data changes."""
         if index.isValid():
             assert isinstance(editor, _VisibilityEditor)
-            editor.set_index(QPersistentModelIndex(index))
+            # Called on every dataChanged of the row: reuse the bound persistent index rather than registering a new one
+            if editor.is_bound_to(index):
+                editor.sync_from_model()
+            else:
+                editor.set_index(QPersistentModelIndex(index))
     # End of def setEditorData
 
 
@@ -120,6 +155,26 @@ class VisibilityDelegate(QStyledItemDelegate):
 class ColourDelegate(QStyledItemDelegate):
     """ Displays a color swatch; on edit, opens a QColorDialog.  """
 
+    # --- --- --- Constructor --- --- ---
+
+    def __init__(self, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self._dlg: QColorDialog | None = None # Created on first edit, then reused: building the dialog dominates the first-click latency
+    # End of def __init__
+
+
+    def _get_dialog(self, parent: QWidget) -> QColorDialog:
+        """Return the shared colour dialog, reparented under parent if needed."""
+        if (dlg := self._dlg) is None:
+            dlg = self._dlg = QColorDialog(parent)
+            # optional: avoid native dialogs (which often ignore position)
+            dlg.setOption(QColorDialog.ColorDialogOption.DontUseNativeDialog, True)
+        elif dlg.parentWidget() is not parent:
+            dlg.setParent(parent, Qt.WindowType.Dialog)
+        return dlg
+    # End of def _get_dialog
+
+
     def paint(self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex) -> None:
         # Paint underlying cell by default
         super().paint(painter, option, index)
@@ -146,14 +201,11 @@ class ColourDelegate(QStyledItemDelegate):
         color_value = index.data(Qt.ItemDataRole.EditRole)
         current_color = color_value if isinstance(color_value, QColor) else QColor(str(color_value))
         if not current_color.isValid():
-            current_color = None
-
-        # Create and show dialog, on accept, set model data
-        dlg = QColorDialog(parent, currentColor=current_color)
-
-        # optional: avoid native dialogs (which often ignore position)
-        dlg.setOption(QColorDialog.ColorDialogOption.DontUseNativeDialog, True)
+            current_color = QColor(Qt.GlobalColor.white)
 
+        # Show the shared dialog, on accept, set model data
+        dlg = self._get_dialog(parent)
+        dlg.setCurrentColor(current_color)
 
         # --- position near cell ---
         margin = 5
@@ -223,13 +275,21 @@ class CategoryDelegate(QStyledItemDelegate):
     def __init__(self, controller: InstanceController, parent: QObject | None = None) -> None:
         super().__init__(parent)
         self._controller = controller
+        self._cached_cats: list[str] | None = None # Rebuilt on next use after the controller's categories change
+        controller.categories_changed.connect(self._on_categories_changed)
     # End of def __init__
 
 
+    def _on_categories_changed(self) -> None:
+        self._cached_cats = None
+    # End of def _on_categories_changed
+
+
     def _populate_categories(self, combo: QComboBox) -> None:
+        if self._cached_cats is None:
+            self._cached_cats = self._controller.all_categories()
         combo.clear()
-        cats = self._controller.all_categories()
-        combo.addItems(cats)
+        combo.addItems(self._cached_cats)
     # End of def _populate_categories
 
 
@@ -1,12 +1,13 @@
 """Positive/Negative Markers QGraphicsItems."""
 # --- --- --- Imports --- --- ---
 # STD
+from collections import OrderedDict
 from enum import StrEnum
 from typing import cast
 # 3RD
 import cv2
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QImage, QPainter, QPixmap, QColor
+from PySide6.QtCore import Qt, QPoint
+from PySide6.QtGui import QImage, QPainter, QPixmap, QPixmapCache, QColor
 import numpy as np
 from numpy.typing import NDArray
 # Project
@@ -18,7 +19,12 @@ from samnotator.datamodel import MaskHW
 
 
 class MarkRenderer:
-    """Utility class used to render marker symbols with backgrounds"""
+    """Utility class used to render marker symbols with backgrounds.
+    Rendered marks are shared through the global QPixmapCache: instances with the same colours and size get the same pixmaps.
+    The last few sizes are also kept per renderer, so that repeated requests skip the global lookup altogether.
+    """
+
+    _LOCAL_CACHE_SIZES:int = 8
 
     def __init__(self, symbols:list[str], main_colour:QColor, contrast_colour:QColor, shape_size_ratio:float=0.9, symbol_size_ratio:float=0.85, aa_margin:int=1):
         self._symbols = symbols
@@ -30,6 +36,8 @@ class MarkRenderer:
         # Init renderers
         self._symbol_renderer = PatchFontSymbolRenderer(self._symbols, self._contrast_colour)
         self._background_renderer = PatchBackgroundRenderer(self._main_colour, self._contrast_colour, self._shape_size_ratio, self._aa_margin)
+        # Last rendered sizes (adjusted size -> marks), oldest first; cleared when colours change
+        self._local_cache:OrderedDict[int, list[QPixmap]] = OrderedDict()
     #
 
 
@@ -57,6 +65,7 @@ class MarkRenderer:
         #
         self._symbol_renderer = PatchFontSymbolRenderer(self._symbols, self._contrast_colour)
         self._background_renderer = PatchBackgroundRenderer(self._main_colour, self._contrast_colour, self._shape_size_ratio, self._aa_margin)
+        self._local_cache.clear()
     # End of def set_colors
 
 
@@ -67,6 +76,24 @@ class MarkRenderer:
         if pixmap_size_px == 0:
             return [QPixmap()] * len(self._symbols)
 
+        # Local cache lookup: no key building, no global lookup
+        local_cache = self._local_cache
+        if (local := local_cache.get(pixmap_size_px)) is not None:
+            local_cache.move_to_end(pixmap_size_px)
+            return list(local)
+
+        # Shared cache lookup: all symbols must hit, else render them all again
+        keys = [self._cache_key(symbol, pixmap_size_px) for symbol in self._symbols]
+        cached:list[QPixmap] = []
+        for key in keys:
+            pm = QPixmap()
+            if not QPixmapCache.find(key, pm):
+                break
+            cached.append(pm)
+        else:
+            self._remember(pixmap_size_px, cached)
+            return cached
+
         # Target size
         symbol_size_px = max(1, int(pixmap_size_px * self._symbol_size_ratio))
 
@@ -76,19 +103,37 @@ class MarkRenderer:
         # Get background pixmap
         background_pixmap = self._background_renderer.get(pixmap_size_px)
 
-        # Compose final pixmaps
+        # Compose final pixmaps: each one starts as a copy of the background (shared until painted on, then a plain copy,
+        # no transparent fill + background blit), with one painter reused across targets
         final_pixmaps = []
+        p = QPainter()
         for symbol_pixmap in symbol_pixmaps:
-            final_pixmap = QPixmap(pixmap_size_px, pixmap_size_px)
-            final_pixmap.fill(Qt.GlobalColor.transparent)
-            p = QPainter(final_pixmap)
-            p.drawPixmap(0, 0, background_pixmap)
+            final_pixmap = QPixmap(background_pixmap)
+            p.begin(final_pixmap)
             p.drawPixmap(0, 0, symbol_pixmap)
             p.end()
             final_pixmaps.append(final_pixmap)
 
+        for key, final_pixmap in zip(keys, final_pixmaps):
+            QPixmapCache.insert(key, final_pixmap)
+        self._remember(pixmap_size_px, final_pixmaps)
         return final_pixmaps
     # End of def get
+
+
+    def _remember(self, pixmap_size_px:int, marks:list[QPixmap]) -> None:
+        """Keep marks in the local cache, dropping the oldest size beyond _LOCAL_CACHE_SIZES."""
+        self._local_cache[pixmap_size_px] = list(marks)
+        if len(self._local_cache) > self._LOCAL_CACHE_SIZES:
+            self._local_cache.popitem(last=False)
+    # End of def _remember
+
+
+    def _cache_key(self, symbol:str, pixmap_size_px:int) -> str:
+        """QPixmapCache key for one rendered mark: everything that changes its pixels."""
+        return (f"mark:{self._main_colour.rgba():08x}:{self._contrast_colour.rgba():08x}:{symbol}:{pixmap_size_px}"
+                f":{self._shape_size_ratio}:{self._symbol_size_ratio}:{self._aa_margin}")
+    # End of def _cache_key
 # End of class MarkerRenderer
 
 
@@ -105,6 +150,18 @@ class MaskMode(StrEnum):
 
 UInt8Array = NDArray[np.uint8]
 
+# Modes leaving everything outside the mask fully transparent: these can be rendered over the mask's bounding box only
+_TRANSPARENT_BG_MODES:frozenset[MaskMode] = frozenset({MaskMode.PLAIN, MaskMode.SOLID_TRANSPARENT, MaskMode.FANCY})
+# Solid rings drawn by FANCY inside the mask boundary: pixels at chessboard distance 1.._FANCY_RINGS from the background
+_FANCY_RINGS:int = 3
+# Background kept around the bounding box of a cropped mask. FANCY rings come from the distance to the nearest False pixel,
+# and the crop edge does not count as False: the pixels within the ring width must stay in the crop to get the full mask's rings.
+_CROP_MARGIN:int = _FANCY_RINGS
+# Fixed RGBA colours of the plain modes
+_RGBA_TRANSPARENT:tuple[int, int, int, int] = (0, 0, 0, 0)
+_RGBA_BLACK:tuple[int, int, int, int] = (0, 0, 0, 255)
+_RGBA_WHITE:tuple[int, int, int, int] = (255, 255, 255, 255)
+
 class MaskRenderer:
     """Utility class used to render a mask"""
 
@@ -113,6 +170,10 @@ class MaskRenderer:
         self._contrast_colour = contrast_colour
         self._shape_size_ratio = shape_size_ratio # Currently unused but retained
         self._opacity = opacity
+        self._update_rgba()
+        # Last bounding box scan, as (mask, step, bbox or None if empty): mode/colour toggles re-render the same mask.
+        # Keeps the mask alive, so that `is` is a safe key (masks are never modified in place).
+        self._last_bbox:tuple[MaskHW, int, tuple[int, int, int, int]|None]|None = None
     #
 
 
@@ -125,32 +186,102 @@ class MaskRenderer:
             self._contrast_colour = contrast
         if opacity is not None:
             self._opacity = opacity
+        self._update_rgba()
     # End of def set_colors
 
 
+    def _update_rgba(self):
+        """Cache the QRgb colours of all modes: they only change with set_colors, not per frame."""
+        pack = MaskRenderer._qrgba
+        main_rgb = MaskRenderer._color_to_rgb(self._main_colour)
+        main = pack(*main_rgb, int(max(0.0, min(1.0, self._opacity)) * 255))
+        main_opaque = pack(*main_rgb, 255)
+        contrast_opaque = pack(*MaskRenderer._color_to_rgb(self._contrast_colour), 255)
+        transparent, black, white = pack(*_RGBA_TRANSPARENT), pack(*_RGBA_BLACK), pack(*_RGBA_WHITE)
+        self._plain_words:dict[MaskMode, tuple[int, int]] = {
+            MaskMode.PLAIN: (main, transparent),
+            MaskMode.SOLID_TRANSPARENT: (main_opaque, transparent),
+            MaskMode.SOLID_CONTRAST: (main_opaque, contrast_opaque),
+            MaskMode.SOLID_BLACK: (main_opaque, black),
+            MaskMode.BW: (white, black),
+        }
+        self._fancy_table:list[int] = MaskRenderer._fancy_colour_table(main_rgb, MaskRenderer._color_to_rgb(self._contrast_colour), self._opacity)
+    # End of def _update_rgba
+
+
     def get(self, mask:MaskHW, mode:MaskMode) -> QPixmap|None:
         """
         Render a boolean HxW mask as a QPixmap based on the specified mode.
         :param mask: The 2D boolean mask.
         :param mode: The rendering style ('plain', 'solid_main', 'bw', 'fancy').
         """
-        if mask.ndim != 2:
-            raise ValueError("mask must be 2D (H, W) boolean")
-        if not np.any(mask): # completely empty mask -> None
+        # Only the bounding box of the mask is rendered when the background is transparent, then placed in a full size pixmap
+        if (patch := self.get_patch(mask, mode)) is None: # completely empty mask -> None
             return None
+        pixmap, offset = patch
+        h, w = mask.shape
+        if pixmap.width() == w and pixmap.height() == h:
+            return pixmap
+        full = QPixmap(w, h)
+        full.fill(Qt.GlobalColor.transparent)
+        p = QPainter(full)
+        p.drawPixmap(offset, pixmap)
+        p.end()
+        return full
+    # End of def get 
+
 
+    def _render(self, mask:MaskHW, mode:MaskMode) -> QPixmap:
+        """Render a 2D mask known to be non-empty (no checks)."""
+        if (words := self._plain_words.get(mode)) is not None:
+            return MaskRenderer._mask_plain_pixmap_fast(mask, *words)
         match mode:
-            case MaskMode.PLAIN: return MaskRenderer.mask_plain_pixmap(mask, self._main_colour, self._opacity)
-            case MaskMode.SOLID_TRANSPARENT: return MaskRenderer.mask_plain_pixmap(mask, self._main_colour, 1.0)
-            case MaskMode.SOLID_CONTRAST: return MaskRenderer.mask_plain_pixmap(mask, self._main_colour, 1.0, self._contrast_colour, 1.0)
-            case MaskMode.SOLID_BLACK: return MaskRenderer.mask_plain_pixmap(mask,  self._main_colour, 1.0, QColor(0, 0, 0), 1.0)
-            case MaskMode.BW: return MaskRenderer.mask_plain_pixmap(mask, QColor(255, 255, 255), 1.0, QColor(0, 0, 0, 0), 1.0)
-            case MaskMode.FANCY: return MaskRenderer.mask_fancy_pixmap(mask, self._main_colour, self._contrast_colour, self._opacity)
-            case _: raise ValueError(f"Unknown rendering mode: {mode_}")
-    # End of def get 
+            case MaskMode.FANCY: return MaskRenderer._mask_fancy_pixmap_fast(mask, self._fancy_table)
+            case _: raise ValueError(f"Unknown rendering mode: {mode}")
+    # End of def _render
+
+
+    def get_patch(self, mask:MaskHW, mode:MaskMode, step:int=1) -> tuple[QPixmap, QPoint]|None:
+        """
+        Same as get(), but for modes with a transparent background only render the bounding box of the mask, grown by _CROP_MARGIN.
+        Return the pixmap with its top-left position in the mask, or None if the mask is empty.
+        With step > 1, the mask is first downsampled by keeping one pixel every step in both directions:
+        the pixmap and its position are then in downsampled pixels (scale them by step to get back to the mask).
+        """
+        if mask.ndim != 2:
+            raise ValueError("mask must be 2D (H, W) boolean")
+        if (last := self._last_bbox) is not None and last[0] is mask and last[1] == step:
+            bbox = last[2]
+        else:
+            bbox = MaskRenderer._bbox(mask[::step, ::step] if step > 1 else mask)
+            self._last_bbox = (mask, step, bbox)
+        if bbox is None: # completely empty mask -> None
+            return None
+        if step > 1:
+            mask = mask[::step, ::step] # Nearest neighbour: a strided view, no copy
+        # Emptiness is known from the bounding box: render directly, without another full scan
+        if mode not in _TRANSPARENT_BG_MODES: # The background covers the whole image
+            return self._render(mask, mode), QPoint(0, 0)
+        # Bounding box grown by the margin and clamped to the mask
+        h, w = mask.shape
+        y0, y1, x0, x1 = bbox
+        y0, y1 = max(0, y0 - _CROP_MARGIN), min(h, y1 + _CROP_MARGIN)
+        x0, x1 = max(0, x0 - _CROP_MARGIN), min(w, x1 + _CROP_MARGIN)
+        return self._render(mask[y0:y1, x0:x1], mode), QPoint(x0, y0)
+    # End of def get_patch
 
 
     # --- --- --- Static Rendering Helpers --- --- ---
+
+    @staticmethod
+    def _bbox(mask:MaskHW) -> tuple[int, int, int, int]|None:
+        """Internal helper returning the tight bounding box [y0, y1) x [x0, x1) of a 2D mask as (y0, y1, x0, x1), or None if empty."""
+        rows = mask.any(axis=1)
+        if not rows.any():
+            return None
+        cols = mask.any(axis=0)
+        h, w = mask.shape
+        return int(rows.argmax()), h - int(rows[::-1].argmax()), int(cols.argmax()), w - int(cols[::-1].argmax())
     
     @staticmethod
     def _color_to_rgb(color: QColor|tuple[int, int, int]) -> tuple[int, int, int]:
@@ -160,11 +291,19 @@ class MaskRenderer:
         return color
 
     @staticmethod
-    def _arr_to_pixmap(rgba_arr: np.ndarray) -> QPixmap:
-        """Internal helper to convert RGBA array to QPixmap."""
-        h, w, _ = rgba_arr.shape
-        # Ensure the array is C-contiguous for QImage to read it correctly
-        img = QImage(rgba_arr.tobytes(), w, h, 4 * w, QImage.Format.Format_RGBA8888)
+    def _qrgba(r:int, g:int, b:int, a:int) -> int:
+        """Internal helper packing one colour as a QRgb (#AARRGGBB), for QImage colour tables."""
+        return (a << 24) | (r << 16) | (g << 8) | b
+
+    @staticmethod
+    def _indexed_to_pixmap(indices: np.ndarray, colour_table: list[int]) -> QPixmap:
+        """Internal helper to convert a HxW array of colour indices (uint8 or bool) to a QPixmap, colours given as QRgb."""
+        h, w = indices.shape
+        # 1 byte per pixel, no per-pixel colour work on our side: Qt expands the colours in fromImage.
+        # QImage wraps the buffer without copying: it must outlive img, which it does since fromImage copies the pixels before we return.
+        indices = np.ascontiguousarray(indices).view(np.uint8)
+        img = QImage(indices.data, w, h, indices.strides[0], QImage.Format.Format_Indexed8)
+        img.setColorTable(colour_table)
         return QPixmap.fromImage(img)
 
 
@@ -177,22 +316,20 @@ class MaskRenderer:
         mask_arr = np.asarray(mask)
         if mask_arr.dtype != np.bool_:
             raise TypeError("mask must be boolean")
-        h, w = mask_arr.shape
-        rgba: UInt8Array = np.zeros((h, w, 4), dtype=np.uint8)
-
-        # Set background colour where mask is False
-        bg_r, bg_g, bg_b = MaskRenderer._color_to_rgb(background_colour)
-        bg_alpha = int(max(0.0, min(1.0, background_opacity)) * 255)
-        background_area = ~mask_arr
-        rgba[background_area] = (bg_r, bg_g, bg_b, bg_alpha)
+        if mask_arr.ndim != 2:
+            raise ValueError("mask must be 2D (H, W) boolean")
+        fg = MaskRenderer._qrgba(*MaskRenderer._color_to_rgb(mask_colour), int(max(0.0, min(1.0, mask_opacity)) * 255))
+        bg = MaskRenderer._qrgba(*MaskRenderer._color_to_rgb(background_colour), int(max(0.0, min(1.0, background_opacity)) * 255))
+        return MaskRenderer._mask_plain_pixmap_fast(mask_arr, fg, bg)
+    # End of staticmethod def mask_plain_pixmap
 
-        # Set mask colour where mask is True
-        r, g, b = MaskRenderer._color_to_rgb(mask_colour)
-        alpha = int(max(0.0, min(1.0, mask_opacity)) * 255)
-        rgba[mask_arr] = (r, g, b, alpha)
 
-        return MaskRenderer._arr_to_pixmap(rgba)
-    # End of staticmethod def mask_plain_pixmap
+    @staticmethod
+    def _mask_plain_pixmap_fast(mask_arr:MaskHW, fg:int, bg:int) -> QPixmap:
+        """mask_plain_pixmap without checks: mask_arr is a 2D boolean ndarray, fg and bg are QRgb (see _qrgba)."""
+        # Two colours only: the boolean bytes (0/1) are used as is as colour indices
+        return MaskRenderer._indexed_to_pixmap(mask_arr, [bg, fg])
+    # End of staticmethod def _mask_plain_pixmap_fast
 
 
     @staticmethod
@@ -200,43 +337,40 @@ class MaskRenderer:
         """Renders a mask with 3 solid borders and a semi-transparent fill inside, all strictly contained within the original mask boundary."""
         if mask.dtype != np.bool_:
             raise TypeError("mask must be boolean")
-        
-        # 1) Prepare colors and initial array
-        main_r, main_g, main_b = MaskRenderer._color_to_rgb(main_color)
-        contrast_r, contrast_g, contrast_b = MaskRenderer._color_to_rgb(contrast_color)
-        alpha_fill = int(max(0.0, min(1.0, opacity)) * 255)
+        colour_table = MaskRenderer._fancy_colour_table(MaskRenderer._color_to_rgb(main_color), MaskRenderer._color_to_rgb(contrast_color), opacity)
+        return MaskRenderer._mask_fancy_pixmap_fast(mask, colour_table)
+    # End of staticmethod def mask_fancy_pixmap
+
+
+    @staticmethod
+    def _fancy_colour_table(main_rgb:tuple[int, int, int], contrast_rgb:tuple[int, int, int], opacity:float) -> list[int]:
+        """Colour table of the fancy mask regions (see _mask_fancy_pixmap_fast), as QRgb."""
+        pack = MaskRenderer._qrgba
+        contrast = pack(*contrast_rgb, 255)
+        return [pack(*_RGBA_TRANSPARENT), contrast, pack(*main_rgb, 255), contrast, pack(*main_rgb, int(max(0.0, min(1.0, opacity)) * 255))]
+    # End of staticmethod def _fancy_colour_table
+
+
+    @staticmethod
+    def _mask_fancy_pixmap_fast(mask:MaskHW, colour_table:list[int]) -> QPixmap:
+        """mask_fancy_pixmap without checks, with a precomputed colour table (see _fancy_colour_table)."""
+        # 1) Convert mask to uint8 (0 or 1) for OpenCV (no copy for a contiguous mask)
+        mask_u8:UInt8Array = np.ascontiguousarray(mask).view(np.uint8)
+
+        # 2) Chessboard distance to the nearest False pixel, in one pass: a pixel survives k erosions by a 3x3 square iff its distance is > k.
+        # Like cv2.erode, the outside of the image does not count as False.
+        dist = cast(NDArray[np.float32], cv2.distanceTransform(mask_u8, cv2.DIST_C, 3))
+
+        # 3) The number of erosions a pixel survives, capped to _FANCY_RINGS+1, is its region, used as colour index
+        # 0: outside --> Transparent
+        # 1: Border 1 (Outer), M0 \ M1 --> Contrast Color (Solid)
+        # 2: Border 2 (Middle), M1 \ M2 --> Main Color (Solid)
+        # 3: Border 3 (Inner), M2 \ M3 --> Contrast Color (Solid)
+        # 4: Interior Fill, M3 --> Main Color (Semi-transparent)
+        np.minimum(dist, _FANCY_RINGS + 1, out=dist)
+        regions = dist.astype(np.uint8)
 
-        h, w = mask.shape
-        rgba = np.zeros((h, w, 4), dtype=np.uint8) # Fully transparent initial
-        
-        # Convert mask to uint8 (0 or 255) for OpenCV morphology
-        mask_u8:UInt8Array = mask.astype(np.uint8) * 255
-        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
-        
-        # 2) Perform sequential erosions
-        M0 = mask_u8                                # Original Mask
-        M1 = cast(UInt8Array, cv2.erode(M0, kernel, iterations=1))    # 1px eroded
-        M2 = cast(UInt8Array, cv2.erode(M1, kernel, iterations=1))    # 2px eroded
-        M3 = cast(UInt8Array, cv2.erode(M2, kernel, iterations=1))    # 3px eroded
-
-        # 3) Define the four distinct regions (borders and interior)
-        # Border 1 (Outer): M0 \ M1 --> Contrast Color (Solid)
-        border_1 = (M0 == 255) & (M0 != M1)
-        rgba[border_1] = (contrast_r, contrast_g, contrast_b, 255)
-        
-        # Border 2 (Middle): M1 \ M2 --> Main Color (Solid)
-        border_2 = (M1 == 255) & (M1 != M2)
-        rgba[border_2] = (main_r, main_g, main_b, 255)
-        
-        # Border 3 (Inner): M2 \ M3 --> Contrast Color (Solid)
-        border_3 = (M2 == 255) & (M2 != M3)
-        rgba[border_3] = (contrast_r, contrast_g, contrast_b, 255)
-        
-        # Interior Fill: M3 --> Main Color (Semi-transparent)
-        interior_fill = (M3 == 255)
-        rgba[interior_fill] = (main_r, main_g, main_b, alpha_fill)
-        
         # 4. Convert to QPixmap
-        return MaskRenderer._arr_to_pixmap(rgba)
-    # End of staticmethod def mask_fancy_pixmap
+        return MaskRenderer._indexed_to_pixmap(regions, colour_table)
+    # End of staticmethod def _mask_fancy_pixmap_fast
 # End of class MaskRenderer
\ No newline at end of file
@@ -3,13 +3,14 @@ Models the data to be displayed in the instance table view, associated logic and
 """
 # --- --- --- Imports --- --- ---
 # STD
-from typing import Any
+from typing import Any, Callable
 from enum import IntEnum
+from bisect import bisect_left
 # 3RD
 from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QObject, Slot
 from PySide6.QtGui import QColor
 # Project
-from samnotator.controllers.instance_controller import InstanceController, InstanceID, InstanceInfo, Instance
+from samnotator.controllers.instance_controller import InstanceController, InstanceID, InstanceInfo
 from samnotator.utils._CUD import CUD
 
 
@@ -23,6 +24,9 @@ class Columns(IntEnum):
     COLOR = 3
 # End of class Columns
 
+_COLUMN_COUNT:int = len(Columns)
+_LAST_COLUMN:int = _COLUMN_COUNT - 1
+
 
 # Column Header Labels
 HEADER_LABELS:dict[int, str] = {
@@ -36,6 +40,17 @@ HEADER_LABELS:dict[int, str] = {
 # Custom roles for the visibility delegate, to be defined 'after' UserRole
 ROLE_MARK_VISIBLE = int(Qt.ItemDataRole.UserRole) + 1
 ROLE_MASK_VISIBLE = int(Qt.ItemDataRole.UserRole) + 2
+# Write-only role: value is a dict {ROLE_MARK_VISIBLE|ROLE_MASK_VISIBLE: bool}, applied as a single update
+ROLE_VISIBILITY_BULK = int(Qt.ItemDataRole.UserRole) + 3
+
+# Plain int roles, converted once: data()/setData()/headerData() are called for every cell on each repaint
+_DISPLAY_ROLE = int(Qt.ItemDataRole.DisplayRole)
+_EDIT_ROLE = int(Qt.ItemDataRole.EditRole)
+_DISPLAY_OR_EDIT:tuple[int, int] = (_DISPLAY_ROLE, _EDIT_ROLE)
+_DISPLAY_EDIT_ROLES:list[int] = [_DISPLAY_ROLE, _EDIT_ROLE] # dataChanged roles (Qt copies the list)
+
+# Invalid index = parent of all rows (flat table), built once; Qt only reads it
+_ROOT = QModelIndex()
 
 
 # --- --- --- InstanceTableModel --- --- ---
@@ -48,6 +63,10 @@ class InstanceTableModel(QAbstractTableModel):
         super().__init__(parent)
         self._controller = controller
         self._instance_ids: list[InstanceID] = self._controller.all_instance_ids()
+        # Reverse of _instance_ids: O(1) row lookups for the controller callbacks and selection sync
+        self._id_to_row: dict[InstanceID, int] = {iid: row for row, iid in enumerate(self._instance_ids)}
+        # Row -> info, shared by the data() calls of all columns/roles of a row; cleared on every controller change
+        self._info_cache: dict[int, InstanceInfo] = {}
     # End of def __init__
 
 
@@ -62,45 +81,56 @@ class InstanceTableModel(QAbstractTableModel):
     # End of def instance_info_for_row
 
     def row_of_instance_id(self, instance_id: InstanceID) -> int | None:
-        try:
-            return self._instance_ids.index(instance_id)
-        except ValueError:
-            return None
+        return self._id_to_row.get(instance_id)
     # End of def row_of_instance_id
+
+    def _shift_rows(self, first: int, delta: int) -> None:
+        """Shift by delta the rows in _id_to_row of the ids at index >= first in _instance_ids."""
+        id_to_row = self._id_to_row
+        for iid in self._instance_ids[first:]:
+            id_to_row[iid] += delta
+    # End of def _shift_rows
     
     # --- --- --- Controller callbacks --- --- ---
 
-    @Slot(object, CUD)
+    @Slot(int, CUD)
     def handle_instance_changed(self, instance_id: InstanceID, cud: CUD) -> None:
         """
         - CREATE: insert one row at the right sorted position
         - DELETE: remove that row
-        - UPDATE: emit dataChanged for that row (no structural change)
+        - UPDATE: emit dataChanged for the cells of that row that changed (no structural change)
         """
+        old_infos, self._info_cache = self._info_cache, {}
         match cud:
 
             case CUD.CREATE:
-                # recompute sorted IDs and find where the new one ends up
-                new_ids = self._controller.all_instance_ids()
-                row = new_ids.index(instance_id)
-                self.beginInsertRows(QModelIndex(), row, row)
-                self._instance_ids = new_ids
+                # IDs are kept sorted (controller hands them out increasingly): binary search, usually ends up last
+                row = bisect_left(self._instance_ids, instance_id)
+                self.beginInsertRows(_ROOT, row, row)
+                self._instance_ids.insert(row, instance_id)
+                self._shift_rows(row + 1, +1)
+                self._id_to_row[instance_id] = row
                 self.endInsertRows()
             #
 
-            case CUD.DELETE if instance_id in self._instance_ids:
-                row = self._instance_ids.index(instance_id)
-                self.beginRemoveRows(QModelIndex(), row, row)
+            case CUD.DELETE if (row := self._id_to_row.get(instance_id)) is not None:
+                self.beginRemoveRows(_ROOT, row, row)
                 self._instance_ids.pop(row)
+                del self._id_to_row[instance_id]
+                self._shift_rows(row, -1)
                 self.endRemoveRows()
             #
 
-            case CUD.UPDATE if instance_id in self._instance_ids:
-                row = self._instance_ids.index(instance_id)
-                top_left = self.index(row, 0)
-                bottom_right = self.index(row, self.columnCount() - 1)
+            case CUD.UPDATE if (row := self._id_to_row.get(instance_id)) is not None:
                 # reflect external updates (e.g. from other widgets)
-                self.dataChanged.emit(top_left, bottom_right)
+                if (old_info := old_infos.get(row)) is None: # Never displayed: no previous state to compare to
+                    top_left = self.index(row, 0)
+                    bottom_right = self.index(row, _LAST_COLUMN)
+                    self.dataChanged.emit(top_left, bottom_right)
+                else: # Only the changed cells/roles: most updates touch a single field (or none displayed here)
+                    for col, roles in self._changed_cells(old_info, self._controller.get(instance_id)):
+                        index = self.index(row, col)
+                        self.dataChanged.emit(index, index, roles)
             #
 
             case _:
@@ -108,6 +138,21 @@ class InstanceTableModel(QAbstractTableModel):
     # End of def handle_instance_changed
 
     
+    @staticmethod
+    def _changed_cells(old: InstanceInfo, new: InstanceInfo) -> list[tuple[int, list[int]]]:
+        """(column, roles) of the cells whose data differ between two infos of the same instance."""
+        cells: list[tuple[int, list[int]]] = []
+        visible_roles: list[int] = []
+        if old.show_markers != new.show_markers: visible_roles.append(ROLE_MARK_VISIBLE)
+        if old.show_mask != new.show_mask: visible_roles.append(ROLE_MASK_VISIBLE)
+        if visible_roles: cells.append((Columns.VISIBLE, visible_roles))
+        if old.instance.instance_name != new.instance.instance_name: cells.append((Columns.NAME, _DISPLAY_EDIT_ROLES))
+        if old.instance.category_name != new.instance.category_name: cells.append((Columns.CATEGORY, _DISPLAY_EDIT_ROLES))
+        if old.main_colour != new.main_colour: cells.append((Columns.COLOR, _DISPLAY_EDIT_ROLES))
+        return cells
+    # End of staticmethod def _changed_cells
+
+    
     # --- --- --- Qt model API/overrids --- --- ---
 
     def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
@@ -118,15 +163,15 @@ class InstanceTableModel(QAbstractTableModel):
 
     def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
         if parent.isValid(): return 0 # No child columns
-        return 4
+        return _COLUMN_COUNT
     #
 
 
     def index(self, row: int, column: int, parent: QModelIndex = QModelIndex()) -> QModelIndex:
         """Creates a QModelIndex (a pointer) for a given row and column, which views use to request specific data points."""
         if parent.isValid(): return QModelIndex() # No child items
-        if not (0 <= row < self.rowCount()): return QModelIndex()
-        if not (0 <= column < self.columnCount()): return QModelIndex()
+        if not (0 <= row < len(self._instance_ids)): return QModelIndex()
+        if not (0 <= column < _COLUMN_COUNT): return QModelIndex()
         return self.createIndex(row, column)
     # End of def index
 
@@ -139,44 +184,17 @@ class InstanceTableModel(QAbstractTableModel):
 
         row = index.row()
         col = index.column()
-        if not (0 <= row < len(self._instance_ids)):
+        instance_ids = self._instance_ids
+        if not (0 <= row < len(instance_ids)) or not (0 <= col < len(_DATA_HANDLERS)):
             return None
 
-        # Get instance info
-        info:InstanceInfo = self.instance_info_at_row(row)
-        instance:Instance = info.instance
-        main_colour = info.main_colour
-
-        # Per column/role data
-        match col:
-            case Columns.VISIBLE:
-                if int(role) == ROLE_MARK_VISIBLE:
-                    return bool(info.show_markers)
-                if int(role) == ROLE_MASK_VISIBLE:
-                    return bool(info.show_mask)
-                return None
-            #
-
-            case Columns.NAME:
-                if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
-                    return instance.instance_name
-                return None
-            #
-
-            case Columns.CATEGORY:
-                if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
-                    return instance.category_name
-                return None
-            #
-
-            case Columns.COLOR:
-                if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
-                    return QColor(main_colour)
-                return None
-            #
+        # Get instance info (inlined instance_info_at_row)
+        info_cache = self._info_cache
+        if (info := info_cache.get(row)) is None:
+            info = info_cache[row] = self._controller.get(instance_ids[row])
 
-            case _: return None
-        # End of match col
+        # Per column/role data: indexed dispatch instead of a match chain
+        return _DATA_HANDLERS[col](info, role)
     # End of def data
 
 
@@ -191,37 +209,50 @@ class InstanceTableModel(QAbstractTableModel):
             return False
 
         instance_id = self._instance_ids[row]
+        # Current state: edits that do not change anything are accepted without update (no repaint cascade).
+        # No dataChanged here: update_instance synchronously calls back handle_instance_changed, which emits it for the changed cells.
+        info = self._controller.get(instance_id)
 
         # Visibility toggles
         match col:
             case Columns.VISIBLE:
                 if role == ROLE_MARK_VISIBLE:
+                    if bool(value) == info.show_markers: return True
                     self._controller.update_instance(instance_id, show_markers=bool(value))
-                    self.dataChanged.emit(index, index, [ROLE_MARK_VISIBLE])
                     return True
                 if role == ROLE_MASK_VISIBLE:
+                    if bool(value) == info.show_mask: return True
                     self._controller.update_instance(instance_id, show_mask=bool(value))
-                    self.dataChanged.emit(index, index, [ROLE_MASK_VISIBLE])
+                    return True
+                if role == ROLE_VISIBILITY_BULK and isinstance(value, dict) and value:
+                    show_markers = value.get(ROLE_MARK_VISIBLE)
+                    show_mask = value.get(ROLE_MASK_VISIBLE)
+                    if show_markers is not None and bool(show_markers) == info.show_markers: show_markers = None
+                    if show_mask is not None and bool(show_mask) == info.show_mask: show_mask = None
+                    if show_markers is None and show_mask is None: return True
+                    self._controller.update_instance(instance_id,
+                        show_markers=None if show_markers is None else bool(show_markers),
+                        show_mask=None if show_mask is None else bool(show_mask))
                     return True
                 return False
             #
 
-            case Columns.NAME if role == Qt.ItemDataRole.EditRole:
+            case Columns.NAME if role == _EDIT_ROLE:
+                if str(value) == info.instance.instance_name: return True
                 self._controller.update_instance(instance_id, name=str(value))
-                self.dataChanged.emit(index, index, [int(Qt.ItemDataRole.DisplayRole), int(Qt.ItemDataRole.EditRole)])
                 return True
             #
 
-            case Columns.CATEGORY if role == int(Qt.ItemDataRole.EditRole):
+            case Columns.CATEGORY if role == _EDIT_ROLE:
+                if str(value) == info.instance.category_name: return True
                 self._controller.update_instance(instance_id, category_name=str(value))
-                self.dataChanged.emit(index, index, [int(Qt.ItemDataRole.DisplayRole), int(Qt.ItemDataRole.EditRole)])
                 return True
             #
 
-            case Columns.COLOR if role == int(Qt.ItemDataRole.EditRole):
+            case Columns.COLOR if role == _EDIT_ROLE:
                 if isinstance(value, QColor):
+                    if value == info.main_colour: return True
                     self._controller.update_instance(instance_id, colour=value)
-                    self.dataChanged.emit(index, index, [int(Qt.ItemDataRole.DisplayRole), int(Qt.ItemDataRole.EditRole)])
                     return True
                 return False
             #
@@ -245,8 +276,33 @@ class InstanceTableModel(QAbstractTableModel):
 
     def headerData(self, section: int, orientation: Qt.Orientation, role:Qt.ItemDataRole|int = Qt.ItemDataRole.DisplayRole) -> Any:
         """Provides the text labels for the horizontal headers ("Vis", "Instance", "Category", "Color")."""
-        if role != int(Qt.ItemDataRole.DisplayRole): return None
+        if role != _DISPLAY_ROLE: return None
         if orientation == Qt.Orientation.Horizontal: return HEADER_LABELS.get(section, None)
         return None
     # End of def headerData
-# End of class InstanceTableModel
\ No newline at end of file
+# End of class InstanceTableModel
+
+
+# --- --- --- Per column data handlers (see InstanceTableModel.data) --- --- ---
+
+def _data_visible(info:InstanceInfo, role:int) -> Any:
+    if role == ROLE_MARK_VISIBLE: return bool(info.show_markers)
+    if role == ROLE_MASK_VISIBLE: return bool(info.show_mask)
+    return None
+# End of def _data_visible
+
+def _data_name(info:InstanceInfo, role:int) -> Any:
+    return info.instance.instance_name if role in _DISPLAY_OR_EDIT else None
+# End of def _data_name
+
+def _data_category(info:InstanceInfo, role:int) -> Any:
+    return info.instance.category_name if role in _DISPLAY_OR_EDIT else None
+# End of def _data_category
+
+def _data_colour(info:InstanceInfo, role:int) -> Any:
+    # Already a QColor: Qt copies it into the QVariant, no need for our own copy
+    return info.main_colour if role in _DISPLAY_OR_EDIT else None
+# End of def _data_colour
+
+# Indexed by Columns
+_DATA_HANDLERS:tuple[Callable[[InstanceInfo, int], Any], ...] = (_data_visible, _data_name, _data_category, _data_colour)
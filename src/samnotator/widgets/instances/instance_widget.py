@@ -1,10 +1,10 @@
 # --- --- --- Imports --- --- ---
 # STD
 # 3RD
-from PySide6.QtCore import QSize, QModelIndex
+from PySide6.QtCore import QSize, QModelIndex, QTimer
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableView
 # Project
-from samnotator.controllers.instance_controller import InstanceController
+from samnotator.controllers.instance_controller import InstanceController, InstanceID
 from samnotator.utils_qt.colours import ColourGenerator
 from .instance_table_model import InstanceTableModel, Columns
 from .delegates import VisibilityDelegate, CategoryDelegate, ColourDelegate
@@ -24,6 +24,8 @@ class InstanceWidget(QWidget):
         self._add_btn = QPushButton("Add instance")
         self._del_btn = QPushButton("Delete instance")
         self._colour_generator = ColourGenerator()
+        # Inserted instances still waiting for their visibility editor, opened in one batch on the next event loop pass
+        self._pending_editor_ids: list[InstanceID] = []
 
         self._init_ui()
     # End of def __init__
@@ -115,7 +117,8 @@ class InstanceWidget(QWidget):
         self._controller.set_current_instance(iid)
 
         # handle_instance_changed(CREATE) has already inserted the row
-        row = self._model._instance_ids.index(iid)
+        row = self._model.row_of_instance_id(iid)
+        assert row is not None
         idx = self._model.index(row, 0)
 
         self._view.selectRow(idx.row())
@@ -153,7 +156,7 @@ class InstanceWidget(QWidget):
                 sel_model.clearSelection()
             elif (row := self._model.row_of_instance_id(instance_id)) is not None:
                 index = self._model.index(row, 0)
-                if self._view.currentIndex() != index:
+                if self._view.currentIndex().row() != row: # Already there (any column): no selection/scroll churn
                     self._view.selectRow(row)
                     self._view.scrollTo(index, QTableView.ScrollHint.PositionAtCenter)
             #
@@ -162,19 +165,37 @@ class InstanceWidget(QWidget):
 
 
 
+    def _open_visibility_editors(self, rows: list[int]) -> None:
+        """Open the editors with view updates disabled: a single layout/repaint pass for the whole batch."""
+        view = self._view
+        view.setUpdatesEnabled(False)
+        try:
+            for row in rows:
+                view.openPersistentEditor(self._model.index(row, Columns.VISIBLE))
+        finally:
+            view.setUpdatesEnabled(True)
+    # End of def _open_visibility_editors
+
+
     def _open_visibility_editors_for_all_rows(self) -> None:
-        for row in range(self._model.rowCount()):
-            idx = self._model.index(row, Columns.VISIBLE)
-            self._view.openPersistentEditor(idx)
+        self._open_visibility_editors(list(range(self._model.rowCount())))
     #
 
 
     def _on_rows_inserted(self, parent: QModelIndex, first: int, last: int) -> None:
-        for row in range(first, last + 1):
-            idx = self._model.index(row, Columns.VISIBLE)
-            self._view.openPersistentEditor(idx)
+        """Record the new instances (ids: rows may shift before the flush) and schedule a single flush for bulk insertions."""
+        if not self._pending_editor_ids:
+            QTimer.singleShot(0, self._flush_pending_editors)
+        self._pending_editor_ids.extend(self._model.instance_id_at_row(row) for row in range(first, last + 1))
     #
 
 
+    def _flush_pending_editors(self) -> None:
+        ids, self._pending_editor_ids = self._pending_editor_ids, []
+        rows = [row for iid in ids if (row := self._model.row_of_instance_id(iid)) is not None] # Skip already deleted
+        self._open_visibility_editors(rows)
+    # End of def _flush_pending_editors
+
+
 
 # End of class InstanceWidget
\ No newline at end of file